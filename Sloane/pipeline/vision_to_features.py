@@ -2,20 +2,37 @@
 
 import cv2
 import os
+import sys
 import torch
 import numpy as np
-import pandas as pd
-from ultralytics import YOLO
 from pathlib import Path
 
+# Shared vision helpers live in nba_cv_2025_finals/
+sys.path.append(str(Path(__file__).resolve().parents[2] / "nba_cv_2025_finals"))
+from detectors import load_detector
+from inference_cache import InferenceCache, cached_detections
+from sharded_detection import sharded_detections
+from video_io import FrameReader, sample_frames
+from checkpoint import CheckpointWriter
+from track_store import TrackStore
+from tracker import Tracker
+
 # === Config ===
 VIDEO_PATH = "data/game72016.mp4"  # replace with actual file
 MODEL_PATH = "yolov8x.pt"     # or use "yolov8x.pt" for accuracy
+BACKEND = "ultralytics"       # or "onnx" / "openvino" (exported on first use, see detectors.py)
+PRECISION = "fp32"            # "int8" (onnx, openvino) or "fp16" (openvino) for faster CPU inference
 CONF_THRESHOLD = 0.3
 SAVE_PATH = "data/features.csv"
+BATCH_SIZE = 4                # Frames per model call (1 = frame-by-frame)
+MAX_TRACK_AGE = 15            # Frames a lost player keeps their id before it is retired
+FLUSH_FRAMES = 900            # Frames between checkpointed flushes to disk
+RESUME = True                 # Continue an interrupted run from its last checkpoint
+USE_INFERENCE_CACHE = True    # Reuse detections from earlier runs on the same video + model
+JOBS = 1                      # Worker processes; >1 splits the video into frame ranges run in parallel
 
 # === Load YOLOv8 model ===
-model = YOLO(MODEL_PATH)
+model = load_detector(MODEL_PATH, BACKEND, PRECISION)
 assert model, "❌ Model load failed."
 
 # === Read video ===
@@ -26,31 +43,73 @@ frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 print(f"🎥 Processing {VIDEO_PATH} at {fps:.2f} FPS, {frame_count} total frames...")
 
 # === Track player centroids + dynamics ===
-all_data = []
-player_tracks = {}  # player_id: [ (frame, (x, y)) ]
+player_tracks = TrackStore()  # row i ↔ i-th buffered row since the last flush
+tracker = Tracker(max_age=MAX_TRACK_AGE)
+
+
+def add_dynamics(df):
+    """Speed & acceleration for the rows being flushed (players' last points carry over)."""
+    speed, acceleration = player_tracks.drain_speed_acceleration(max_gap=MAX_TRACK_AGE)
+    df["speed"] = speed
+    df["acceleration"] = acceleration
+    return df
 
-frame_num = 0
-while True:
-    success, frame = cap.read()
-    if not success:
-        break
 
-    results = model.predict(frame, conf=CONF_THRESHOLD, verbose=False)[0]
-    boxes = results.boxes
-    cls = results.names
+def checkpoint_state():
+    return {"tracker": tracker.state(), "tracks": player_tracks.carry_state()}
 
-    for i, box in enumerate(boxes):
-        cls_id = int(box.cls[0])
-        if cls[cls_id] != "person":
-            continue
 
-        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+# Rows stream to disk every FLUSH_FRAMES frames; a rerun picks up after the last checkpoint
+Path(SAVE_PATH).parent.mkdir(parents=True, exist_ok=True)
+writer = CheckpointWriter(
+    SAVE_PATH,
+    params={"video": VIDEO_PATH, "model": MODEL_PATH, "backend": BACKEND, "precision": PRECISION,
+            "conf": CONF_THRESHOLD, "max_track_age": MAX_TRACK_AGE},
+    flush_frames=FLUSH_FRAMES, state=checkpoint_state, prepare=add_dynamics, resume=RESUME,
+    columns={"frame": "int32", "player_id": "int32", "x": "float32", "y": "float32", "w": "float32",
+             "h": "float32", "cx": "float32", "cy": "float32", "speed": "float32", "acceleration": "float32"},
+)
+if writer.complete:
+    print(f"✅ {SAVE_PATH} is already complete ({writer.total_rows:,} rows)")
+    sys.exit(0)
+
+start_frame = writer.resume_frame
+if writer.last_frame is not None:
+    tracker.load_state(writer.saved_state["tracker"])
+    player_tracks.load_carry_state(writer.saved_state["tracks"])
+    print(f"⏩ Resuming at frame {start_frame} ({writer.total_rows:,} rows on disk)")
+
+# Frames detected by an earlier run on the same video + weights are read back (and never decoded)
+frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+# (sharded runs open it in each worker instead)
+cache = InferenceCache(VIDEO_PATH, model, frame_size, conf=CONF_THRESHOLD) if USE_INFERENCE_CACHE and JOBS == 1 else None
+reread = FrameReader(VIDEO_PATH)  # decodes skipped frames whose cache block was evicted meanwhile
+
+if JOBS > 1:
+    # Workers detect frame ranges in parallel; tracking runs here over the merged, ordered stream
+    detections = sharded_detections(VIDEO_PATH, MODEL_PATH, start_frame, jobs=JOBS, batch_size=BATCH_SIZE,
+                                    use_cache=USE_INFERENCE_CACHE, backend=BACKEND, precision=PRECISION,
+                                    conf=CONF_THRESHOLD)
+else:
+    frames = sample_frames(cap, 1, start_frame, skip_decode=cache.has if cache is not None else None)
+    detections = cached_detections(model, frames, cache, BATCH_SIZE, reread, conf=CONF_THRESHOLD)
+
+for frame_num, data in detections:
+    cls = model.names
+
+    # Keep people only, then give them persistent ids across frames
+    xyxy = data[:, :4]  # rows are [x1, y1, x2, y2, conf, cls]
+    is_person = np.array([cls[int(c)] == "person" for c in data[:, 5]], dtype=bool)
+    xyxy = xyxy[is_person]
+    player_ids = tracker.update(frame_num, xyxy)
+
+    for (x1, y1, x2, y2), player_id in zip(xyxy, player_ids):
         cx = (x1 + x2) / 2
         cy = (y1 + y2) / 2
-        player_id = int(box.id[0]) if box.id is not None else i  # basic ID fallback
+        player_id = int(player_id)
 
         # Save position
-        all_data.append({
+        writer.add({
             "frame": frame_num,
             "player_id": player_id,
             "x": x1,
@@ -61,40 +120,18 @@ while True:
             "cy": cy,
         })
 
-        if player_id not in player_tracks:
-            player_tracks[player_id] = []
-        player_tracks[player_id].append((frame_num, cx, cy))
+        player_tracks.append(frame_num, player_id, cx, cy)
 
-    frame_num += 1
-    if frame_num % 100 == 0:
-        print(f"🔁 Frame {frame_num}/{frame_count}...")
+    writer.frame_done(frame_num)
+    if (frame_num + 1) % 100 == 0:
+        print(f"🔁 Frame {frame_num + 1}/{frame_count}...")
 
 cap.release()
-
-# === Create DataFrame ===
-df = pd.DataFrame(all_data)
-print(f"✅ Detected {len(df)} total player entries.")
-
-# === Add speed & acceleration ===
-df["speed"] = 0.0
-df["acceleration"] = 0.0
-
-for pid, track in player_tracks.items():
-    prev_v = 0
-    for i in range(1, len(track)):
-        f1, x1, y1 = track[i - 1]
-        f2, x2, y2 = track[i]
-
-        dt = f2 - f1
-        dist = np.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        v = dist / dt if dt > 0 else 0
-        a = (v - prev_v) / dt if dt > 0 else 0
-
-        df.loc[(df.player_id == pid) & (df.frame == f2), "speed"] = v
-        df.loc[(df.player_id == pid) & (df.frame == f2), "acceleration"] = a
-        prev_v = v
-
-# === Save to CSV ===
-Path(SAVE_PATH).parent.mkdir(parents=True, exist_ok=True)
-df.to_csv(SAVE_PATH, index=False)
-print(f"📁 Saved frame-level feature data to {SAVE_PATH}")
\ No newline at end of file
+reread.close()
+if cache is not None:
+    cache.close()
+
+# === Final flush (speed & acceleration added per flush) + CSV export ===
+writer.close()
+print(f"✅ Detected {writer.total_rows} total player entries.")
+print(f"📁 Saved frame-level feature data to {SAVE_PATH}")
@@ -7,6 +7,15 @@ from sklearn.cluster import KMeans
 from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
 import seaborn as sns
+import os
+import sys
+
+# Shared vision helpers live in nba_cv_2025_finals/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "nba_cv_2025_finals"))
+from model_registry import save_model, load_model, has_model
+
+MODEL_NAME = "possession_clusters"
+REFIT_MODEL = False  # False: label with the latest registered model if there is one
 
 # === Load and clean possession features ===
 df = pd.read_csv("possessions.csv")
@@ -19,14 +28,26 @@ df["bbox_area"] = df["bbox_area"].replace([np.inf, -np.inf], np.nan).fillna(0)
 # === Features for clustering ===
 features = df[["avg_speed", "avg_acceleration", "bbox_area", "duration"]].copy()
 
-# Scale the data
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(features)
+if REFIT_MODEL or not has_model(MODEL_NAME):
+    # Scale the data
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(features)
+
+    # === Clustering ===
+    k = 4  # number of possession types to discover
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=20)
+    kmeans.fit(X_scaled)
+    bundle = save_model(MODEL_NAME, kmeans, features=list(features.columns), scaler=scaler,
+                        training_rows=len(features), inertia=kmeans.inertia_)
+    print(f"💾 Registered {bundle.name} v{bundle.version}")
+else:
+    bundle = load_model(MODEL_NAME)
 
-# === Clustering ===
-k = 4  # number of possession types to discover
-kmeans = KMeans(n_clusters=k, random_state=42, n_init=20)
-df["cluster"] = kmeans.fit_predict(X_scaled)
+# === Predict-only path: scale + nearest cluster ===
+X_scaled = bundle.transform(features)
+df["cluster"] = bundle.estimator.predict(X_scaled)
+k = bundle.estimator.n_clusters
+print(f"📂 Labelled with {bundle.name} v{bundle.version} (model load {bundle.load_seconds * 1000:.1f} ms)")
 
 # === Save result ===
 df.to_csv("possessions_labeled.csv", index=False)
@@ -0,0 +1,148 @@
+# possession_segmenter.py
+"""
+Per-frame aggregates and an online possession segmenter.
+
+`frame_aggregates` reduces feature rows to one row per frame (spacing,
+mean speed, mean acceleration) in a single grouped pass. `PossessionSegmenter`
+then consumes those aggregates one frame at a time and emits each possession
+as soon as a break closes it, so the same rules run over a saved CSV or a
+live feed.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+
+
+def frame_aggregates(df):
+    """One row per frame: frame, spacing (player bounding-box area), avg_speed, avg_acceleration."""
+    g = df.groupby("frame", sort=True).agg(
+        cx_min=("cx", "min"), cx_max=("cx", "max"),
+        cy_min=("cy", "min"), cy_max=("cy", "max"),
+        avg_speed=("speed", "mean"),
+        avg_acceleration=("acceleration", "mean"),
+    )
+    return pd.DataFrame({
+        "frame": g.index.to_numpy(),
+        "spacing": ((g["cx_max"] - g["cx_min"]) * (g["cy_max"] - g["cy_min"])).to_numpy(),
+        "avg_speed": g["avg_speed"].to_numpy(),
+        "avg_acceleration": g["avg_acceleration"].to_numpy(),
+    })
+
+
+def frame_aggregate(frame, cx, cy, speed, acceleration):
+    """Aggregate for a single frame's detections (live-feed counterpart of frame_aggregates)."""
+    cx, cy = np.asarray(cx), np.asarray(cy)
+    return {
+        "frame": frame,
+        "spacing": (cx.max() - cx.min()) * (cy.max() - cy.min()),
+        "avg_speed": float(np.mean(speed)),
+        "avg_acceleration": float(np.mean(acceleration)),
+    }
+
+
+class _RunningMean:
+    """NaN-skipping mean, like pandas' Series.mean."""
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value):
+        if not math.isnan(value):
+            self.total += value
+            self.count += 1
+
+    @property
+    def value(self):
+        return self.total / self.count if self.count else float("nan")
+
+
+class PossessionSegmenter:
+    """
+    Split a stream of frame aggregates into possessions.
+
+    A new possession starts when the frame gap, the change in spacing, or the
+    relative drop in mean speed versus the previous frame exceeds its
+    threshold. Segments shorter than `min_length` frames are discarded.
+    Only running sums are kept, so memory does not grow with segment length.
+    """
+
+    def __init__(self, frame_gap_threshold=30, spacing_change_threshold=50000,
+                 speed_drop_threshold=0.8, min_length=10):
+        self.frame_gap_threshold = frame_gap_threshold
+        self.spacing_change_threshold = spacing_change_threshold
+        self.speed_drop_threshold = speed_drop_threshold
+        self.min_length = min_length
+        self.prev_frame = None
+        self.prev_spacing = None
+        self.prev_speed = None
+        self._reset()
+
+    def _reset(self):
+        self.start_frame = None
+        self.end_frame = None
+        self.length = 0
+        self.speed = _RunningMean()
+        self.acceleration = _RunningMean()
+        self.spacing = _RunningMean()
+
+    def _is_break(self, frame, spacing, avg_speed):
+        frame_gap = frame - self.prev_frame
+        spacing_diff = abs(spacing - self.prev_spacing) if self.prev_spacing is not None else 0
+        prev_speed = self.prev_speed
+        speed_drop = (prev_speed - avg_speed) / prev_speed if prev_speed and prev_speed > 0 else 0
+        return (
+            frame_gap > self.frame_gap_threshold
+            or spacing_diff > self.spacing_change_threshold
+            or speed_drop > self.speed_drop_threshold
+        )
+
+    def _close(self):
+        possession = None
+        if self.length >= self.min_length:
+            possession = {
+                "start_frame": self.start_frame,
+                "end_frame": self.end_frame,
+                "duration": self.length,
+                "avg_speed": self.speed.value,
+                "avg_acceleration": self.acceleration.value,
+                "bbox_area": self.spacing.value,
+                "frame_count": self.length,
+            }
+        self._reset()
+        return possession
+
+    def push(self, frame, spacing, avg_speed, avg_acceleration):
+        """Add one frame; returns the possession it closed, if any."""
+        closed = None
+        if self.prev_frame is not None and self._is_break(frame, spacing, avg_speed):
+            closed = self._close()
+
+        if self.start_frame is None:
+            self.start_frame = frame
+        self.end_frame = frame
+        self.length += 1
+        self.spacing.add(spacing)
+        self.speed.add(avg_speed)
+        self.acceleration.add(avg_acceleration)
+
+        self.prev_frame = frame
+        self.prev_spacing = spacing
+        self.prev_speed = avg_speed
+        return closed
+
+    def flush(self):
+        """Close the open segment at end of stream; returns it if long enough."""
+        return self._close()
+
+    def segment(self, aggregates):
+        """Batch mode: yield every possession from a frame_aggregates() table."""
+        for row in zip(aggregates["frame"], aggregates["spacing"],
+                       aggregates["avg_speed"], aggregates["avg_acceleration"]):
+            possession = self.push(*row)
+            if possession is not None:
+                yield possession
+        possession = self.flush()
+        if possession is not None:
+            yield possession
@@ -1,59 +1,157 @@
 # track_players.py
 
-from ultralytics import YOLO
 import cv2
 import os
-import pandas as pd
+import sys
+
+# Shared vision helpers live in nba_cv_2025_finals/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "nba_cv_2025_finals"))
+from detectors import load_detector
+from inference_cache import InferenceCache, cached_detections
+from run_profiler import RunProfiler
+from sharded_detection import sharded_detections
+from video_io import FrameReader, MotionSampler, adaptive_frames, sample_frames
+from checkpoint import CheckpointWriter
+from tracker import Tracker
 
 # === CONFIGURATION ===
 VIDEO_PATH = "game72016.mp4"
 MODEL_PATH = "yolov8n.pt"  # Use the smaller model for speed
+BACKEND = "ultralytics"    # or "onnx" / "openvino" (exported on first use, see detectors.py)
+PRECISION = "fp32"         # "int8" (onnx, openvino) or "fp16" (openvino) for faster CPU inference
 CSV_OUTPUT_PATH = "player_detections.csv"
-FRAME_SKIP = 6             # ~5 FPS
+FRAME_SKIP = 6             # ~5 FPS fixed stride, used when ADAPTIVE_SAMPLING is False
+ADAPTIVE_SAMPLING = True   # Stride follows on-court motion (video_io.adaptive_frames) instead of FRAME_SKIP
+MIN_STEP = 4               # Stride during action (~7.5 FPS)
+MAX_STEP = 24              # Stride when play is static (~1.25 FPS)
 MAX_FRAMES = 1000000000000000000
+BATCH_SIZE = 8             # Frames per model call (1 = frame-by-frame)
+MAX_TRACK_AGE = 48         # Frames a lost player keeps their id before it is retired (two MAX_STEP samples)
+FLUSH_FRAMES = 900         # Frames between checkpointed flushes to disk
+RESUME = True              # Continue an interrupted run from its last checkpoint
+USE_INFERENCE_CACHE = True # Reuse detections from earlier runs on the same video + model
+INPUT_SIZE = (1280, 720)   # Frames are resized to this before inference
+JOBS = 1                   # Worker processes; >1 splits the video into frame ranges run in parallel
+PROFILE = False            # Per-stage timings + counters → profiles/track_players_<time>.json
+PROFILE_MODE = None        # With PROFILE: "cprofile" or "tracemalloc" for function / allocation detail
 # === SETUP ===
-model = YOLO(MODEL_PATH)
+profiler = RunProfiler("track_players", enabled=PROFILE, mode=PROFILE_MODE,
+                       params={"video": VIDEO_PATH, "backend": BACKEND, "precision": PRECISION,
+                               "frame_skip": FRAME_SKIP, "batch_size": BATCH_SIZE, "jobs": JOBS})
+with profiler.stage("load_model"):
+    model = profiler.timed_model(load_detector(MODEL_PATH, BACKEND, PRECISION), "inference")
 cap = cv2.VideoCapture(VIDEO_PATH)
+tracker = Tracker(max_age=MAX_TRACK_AGE)
+
+# Detections stream to disk every FLUSH_FRAMES frames; tracker state is saved with each checkpoint
+writer = CheckpointWriter(
+    CSV_OUTPUT_PATH,
+    params={"video": VIDEO_PATH, "model": MODEL_PATH, "backend": BACKEND, "precision": PRECISION,
+            "frame_skip": [MIN_STEP, MAX_STEP] if ADAPTIVE_SAMPLING else FRAME_SKIP,
+            "max_track_age": MAX_TRACK_AGE},
+    flush_frames=FLUSH_FRAMES, state=tracker.state, resume=RESUME,
+    columns={"frame": "int32", "player_id": "int32", "x1": "int32", "y1": "int32", "x2": "int32",
+             "y2": "int32", "cx": "int32", "cy": "int32", "confidence": "float32"},
+)
+if writer.complete:
+    print(f"✅ {CSV_OUTPUT_PATH} is already complete ({writer.total_rows:,} detections)")
+    sys.exit(0)
+
+start_frame = 0
+if writer.last_frame is not None:
+    tracker.load_state(writer.saved_state)
+    start_frame = writer.last_frame + (MIN_STEP if ADAPTIVE_SAMPLING else FRAME_SKIP)  # next frame to sample
+    print(f"⏩ Resuming at frame {start_frame} ({writer.total_rows:,} detections on disk)")
+if not ADAPTIVE_SAMPLING:
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))  # container estimate
+    profiler.count("frames_expected", min(len(range(start_frame, total_frames, FRAME_SKIP)), MAX_FRAMES))
+sampler = MotionSampler(MIN_STEP, MAX_STEP) if ADAPTIVE_SAMPLING else None
+
+# Frames detected by an earlier run on the same video + weights are read back instead of re-run
+# (sharded runs open it in each worker instead)
+cache = InferenceCache(VIDEO_PATH, model, INPUT_SIZE) if USE_INFERENCE_CACHE and JOBS == 1 else None
 
-detections = []
-frame_id = 0
 processed_frame_count = 0
 
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret or processed_frame_count >= MAX_FRAMES:
-        break
 
-    if frame_id % FRAME_SKIP == 0:
-        resized = cv2.resize(frame, (1280, 720))
-        results = model(resized, verbose=False)
+# === FRAME SAMPLING ===
+def sampled_frames(cap):
+    """Yield (frame_id, resized frame) for the frames to run the model on.
+
+    With ADAPTIVE_SAMPLING the stride is MIN_STEP..MAX_STEP depending on
+    motion, otherwise every FRAME_SKIP-th frame. Skipped frames are never
+    resized, and frame_id keeps counting every frame in the video, so the
+    tracker and kinematics see the real gaps. In fixed mode, frames already
+    in the inference cache are not decoded at all (frame is None).
+    """
+    if sampler is not None:
+        frames = adaptive_frames(cap, sampler, start_frame, max_frames=MAX_FRAMES)
+    else:
+        skip = cache.has if cache is not None else None
+        frames = sample_frames(cap, FRAME_SKIP, start_frame, max_frames=MAX_FRAMES, skip_decode=skip)
+    for frame_id, frame in profiler.timed(frames, "decode"):
+        if frame is not None:
+            with profiler.stage("resize"):
+                frame = cv2.resize(frame, INPUT_SIZE)
+        yield frame_id, frame
+
+
+# === BATCHED INFERENCE ===
+reread = FrameReader(VIDEO_PATH, INPUT_SIZE)  # decodes skipped frames whose cache block was evicted meanwhile
+if JOBS > 1:
+    # Workers detect frame ranges in parallel; tracking runs here over the merged, ordered stream
+    # (their decode, resize and inference show up as time spent waiting on "workers")
+    detections = sharded_detections(VIDEO_PATH, MODEL_PATH, start_frame, start_frame + MAX_FRAMES * FRAME_SKIP,
+                                    step=FRAME_SKIP, resize=INPUT_SIZE, jobs=JOBS, batch_size=BATCH_SIZE,
+                                    use_cache=USE_INFERENCE_CACHE, backend=BACKEND, precision=PRECISION,
+                                    adaptive={"min_step": MIN_STEP, "max_step": MAX_STEP} if ADAPTIVE_SAMPLING else None)
+    detections = profiler.timed(detections, "workers")
+else:
+    detections = cached_detections(model, sampled_frames(cap), cache, BATCH_SIZE, reread)
 
-        for result in results:
-            boxes = result.boxes.xyxy.cpu().numpy()
-            classes = result.boxes.cls.cpu().numpy()
-            confidences = result.boxes.conf.cpu().numpy()
+for frame_id, data in detections:
+    with profiler.stage("extract"):
+        boxes = data[:, :4]      # rows are [x1, y1, x2, y2, conf, cls]
+        confidences = data[:, 4]
+        classes = data[:, 5]
+        is_person = classes.astype(int) == 0  # person class
+        boxes, confidences = boxes[is_person], confidences[is_person]
 
-            for box, cls, conf in zip(boxes, classes, confidences):
-                if int(cls) == 0:  # person class
-                    x1, y1, x2, y2 = map(int, box)
-                    cx, cy = int((x1 + x2)/2), int((y1 + y2)/2)
-                    detections.append({
-                        "frame": frame_id,
-                        "x1": x1, "y1": y1,
-                        "x2": x2, "y2": y2,
-                        "cx": cx, "cy": cy,
-                        "confidence": conf
-                    })
+    with profiler.stage("track"):
+        player_ids = tracker.update(frame_id, boxes)
 
-        processed_frame_count += 1
+    with profiler.stage("write"):
+        for box, conf, player_id in zip(boxes, confidences, player_ids):
+            x1, y1, x2, y2 = map(int, box)
+            cx, cy = int((x1 + x2)/2), int((y1 + y2)/2)
+            writer.add({
+                "frame": frame_id,
+                "player_id": int(player_id),
+                "x1": x1, "y1": y1,
+                "x2": x2, "y2": y2,
+                "cx": cx, "cy": cy,
+                "confidence": conf
+            })
+        writer.frame_done(frame_id)
 
-    frame_id += 1
+    processed_frame_count += 1
+    profiler.count("frames")
+    profiler.count("detections", len(data))
+    profiler.count("players", len(boxes))
 
 cap.release()
+reread.close()
+if cache is not None:
+    profiler.count("cache_hits", cache.hits)
+    cache.close()
+if sampler is not None and JOBS <= 1:
+    sampler.report()
+    profiler.count("probes", sampler.probes)
 
-# === SAVE TO CSV ===
-df = pd.DataFrame(detections)
-df.to_csv(CSV_OUTPUT_PATH, index=False)
+# === FINAL FLUSH + CSV EXPORT ===
+with profiler.stage("export"):
+    writer.close()
+profiler.finish()
 
-print(f"✅ Done! Saved {len(detections)} detections from {processed_frame_count} frames.")
-print(f"📄 Output: {CSV_OUTPUT_PATH}")
\ No newline at end of file
+print(f"✅ Done! Saved {writer.total_rows} detections ({processed_frame_count} frames this run).")
+print(f"📄 Output: {CSV_OUTPUT_PATH}")
@@ -1,14 +1,22 @@
 # train_movement_classifier.py
 
-import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
-import joblib
 import numpy as np
+import os
+import sys
+
+# Shared vision helpers live in nba_cv_2025_finals/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "nba_cv_2025_finals"))
+from columnar_store import read_table
+from model_registry import save_model, load_model, has_model
+
+MODEL_NAME = "movement_classifier"
+REFIT_MODEL = True  # False: only score features.csv with the latest registered model
 
 # === Load features ===
-df = pd.read_csv("features.csv")
+df = read_table("features.csv", columns=["vx", "vy", "speed", "acceleration"])
 
 # === Sanitize data: drop rows with NaN or infinite values ===
 df = df.replace([np.inf, -np.inf], np.nan).dropna()
@@ -24,20 +32,30 @@ df["movement_class"] = (df["speed"] > 4.0).astype(int)  # 1 = fast, 0 = slow
 X = df[["vx", "vy", "speed", "acceleration"]]
 y = df["movement_class"]
 
-# === Train/test split ===
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y
-)
-
-# === Train model ===
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_train, y_train)
-
-# === Evaluate ===
-y_pred = clf.predict(X_test)
-print("📊 Classification Report:")
-print(classification_report(y_test, y_pred))
-
-# === Save model ===
-joblib.dump(clf, "movement_classifier.pkl")
-print("✅ Model saved as 'movement_classifier.pkl'")
\ No newline at end of file
+if REFIT_MODEL or not has_model(MODEL_NAME):
+    # === Train/test split ===
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    # === Train model ===
+    clf = RandomForestClassifier(n_estimators=100, random_state=42)
+    clf.fit(X_train, y_train)
+
+    # === Evaluate ===
+    y_pred = clf.predict(X_test)
+    print("📊 Classification Report:")
+    print(classification_report(y_test, y_pred))
+
+    # === Save model ===
+    bundle = save_model(MODEL_NAME, clf, features=list(X.columns), training_rows=len(X_train),
+                        test_accuracy=float((y_pred == y_test).mean()))
+    print(f"✅ Model saved as {bundle.name} v{bundle.version}")
+else:
+    # === Predict-only: score every row with the registered model ===
+    bundle = load_model(MODEL_NAME)
+    y_pred = bundle.predict(X)
+    print(f"📂 Scored {len(X):,} rows with {bundle.name} v{bundle.version} "
+          f"(model load {bundle.load_seconds * 1000:.1f} ms)")
+    print("📊 Classification Report:")
+    print(classification_report(y, y_pred))
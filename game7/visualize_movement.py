@@ -1,11 +1,16 @@
 # visualize_movement.py
 
-import pandas as pd
 import matplotlib.pyplot as plt
-import matplotlib.cm as cm
+import os
+import sys
+
+# Shared vision helpers live in nba_cv_2025_finals/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "nba_cv_2025_finals"))
+from columnar_store import read_table
+from raster import raster_scatter, legend_handles, RASTER_MIN_POINTS
 
 # === Load data ===
-df = pd.read_csv("features.csv")
+df = read_table("features.csv", columns=["frame", "player_id", "speed"])
 df = df[df["speed"] < 100]
 df["movement_class"] = (df["speed"] > 4.0).astype(int)
 
@@ -18,17 +23,22 @@ plt.ylabel("Speed", fontsize=14)
 # === Color map for classes ===
 colors = {0: "blue", 1: "red"}
 
-# === Plot each player ===
-for pid, group in df.groupby("player_id"):
-    plt.scatter(
-        group["frame"], group["speed"],
-        c=group["movement_class"].map(colors),
-        s=8, alpha=0.7, label=f"Player {pid}"
-    )
+# === Plot every row ===
+if len(df) >= RASTER_MIN_POINTS:
+    # Majority movement class per pixel: draw time stays flat as rows grow
+    extent = (df["frame"].min(), df["frame"].max(), 0, df["speed"].max())
+    raster_scatter(plt.gca(), df["frame"], df["speed"], extent,
+                   values=df["movement_class"], how="majority", colors=[colors[0], colors[1]], alpha=0.7)
+else:
+    for pid, group in df.groupby("player_id"):
+        plt.scatter(
+            group["frame"], group["speed"],
+            c=group["movement_class"].map(colors),
+            s=8, alpha=0.7, label=f"Player {pid}"
+        )
 
 # === Add legend and styling ===
-handles = [plt.Line2D([0], [0], marker='o', color='w', label='Fast Movement', markerfacecolor='red', markersize=10),
-           plt.Line2D([0], [0], marker='o', color='w', label='Slow Movement', markerfacecolor='blue', markersize=10)]
+handles = legend_handles(["Fast Movement", "Slow Movement"], ["red", "blue"])
 plt.legend(handles=handles, loc='upper right')
 plt.grid(True, alpha=0.3)
 plt.tight_layout()
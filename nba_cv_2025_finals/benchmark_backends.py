@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Compare detector backends (detectors.py) on the same clip.
+
+For each backend/precision: single-frame latency, batched throughput, and
+how closely its detections agree with the first (reference) backend —
+boxes are matched per frame and class at IoU >= AGREEMENT_IOU. Backends
+whose runtime isn't installed are skipped.
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from benchmark_batch_inference import load_frames, FRAME_SIZE
+from detectors import load_detector
+from tracker import iou_matrix, greedy_assignment
+
+# --- Config ---
+VIDEO_PATH = "game1_highlights.mp4"
+MODEL_PATH = "yolov8n.pt"
+BACKENDS = [                        # the first one is the reference for agreement
+    ("ultralytics", "fp32"),
+    ("onnx", "fp32"),
+    ("onnx", "int8"),
+    ("openvino", "fp32"),
+    ("openvino", "fp16"),
+    ("openvino", "int8"),
+]
+N_FRAMES = 64
+BATCH_SIZE = 8
+WARMUP_FRAMES = 4
+AGREEMENT_IOU = 0.5
+OUTPUT_CSV = "backend_benchmark.csv"
+
+
+def time_backend(detector, frames):
+    """Per-frame latency (batch of 1), batched fps, and the batched detections."""
+    detector.predict(frames[:WARMUP_FRAMES])
+
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        detector.predict([frame])
+        latencies.append(time.perf_counter() - start)
+
+    boxes = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), BATCH_SIZE):
+        boxes.extend(detector.predict(frames[i:i + BATCH_SIZE]))
+    elapsed = time.perf_counter() - start
+    return np.array(latencies), len(frames) / elapsed, boxes
+
+
+def agreement(reference, candidate, iou_threshold=AGREEMENT_IOU):
+    """Precision / recall / F1 of `candidate` boxes against `reference`, plus mean IoU of matches."""
+    matched = n_ref = n_cand = 0
+    ious = []
+    for ref, cand in zip(reference, candidate):
+        n_ref += len(ref)
+        n_cand += len(cand)
+        if not len(ref) or not len(cand):
+            continue
+        iou = iou_matrix(ref[:, :4], cand[:, :4])
+        same_class = ref[:, 5][:, None] == cand[:, 5][None, :]
+        cost = np.where(same_class & (iou >= iou_threshold), 1.0 - iou, 1e6)
+        rows, cols = greedy_assignment(cost)
+        matched += len(rows)
+        ious.extend(iou[rows, cols])
+    precision = matched / n_cand if n_cand else 1.0
+    recall = matched / n_ref if n_ref else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "boxes": n_cand,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "mean_iou": float(np.mean(ious)) if ious else float("nan"),
+    }
+
+
+def main():
+    print("🏀 Detector Backend Benchmark")
+    frames = load_frames(VIDEO_PATH, N_FRAMES)
+    print(f"🎞️  {len(frames)} frames at {FRAME_SIZE[0]}x{FRAME_SIZE[1]}, batch size {BATCH_SIZE}")
+
+    rows = []
+    reference = None
+    for backend, precision in BACKENDS:
+        name = f"{backend}/{precision}"
+        try:
+            start = time.perf_counter()
+            detector = load_detector(MODEL_PATH, backend, precision)
+            load_s = time.perf_counter() - start
+        except (ImportError, ValueError) as exc:
+            print(f"   ⏭️  {name:<18} skipped: {exc}")
+            continue
+
+        latencies, fps, boxes = time_backend(detector, frames)
+        if reference is None:
+            reference = boxes
+            print(f"   📏 {name} is the reference for agreement")
+        row = {
+            "backend": backend,
+            "precision": precision,
+            "load_s": load_s,
+            "latency_ms": 1000 * latencies.mean(),
+            "latency_p95_ms": 1000 * np.percentile(latencies, 95),
+            "fps": fps,
+            **agreement(reference, boxes),
+        }
+        rows.append(row)
+        print(f"   {name:<18} {row['latency_ms']:7.1f} ms/frame  {fps:7.2f} fps  "
+              f"F1 {row['f1']:.3f}  IoU {row['mean_iou']:.3f}")
+
+    if not rows:
+        print("❌ No backend could be loaded")
+        return
+    results = pd.DataFrame(rows)
+    results["speedup"] = results["fps"] / results["fps"].iloc[0]  # relative to the reference
+    results.to_csv(OUTPUT_CSV, index=False)
+
+    best = results.loc[results["fps"].idxmax()]
+    print(f"\n✅ Fastest: {best['backend']}/{best['precision']} ({best['fps']:.2f} fps, "
+          f"{best['speedup']:.2f}x, F1 {best['f1']:.3f} vs reference)")
+    print(f"📄 Results saved to {OUTPUT_CSV}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark YOLO throughput (frames/sec) against inference batch size on CPU.
+
+Frames are decoded and resized once up front so only model time is measured.
+If the video is missing, seeded random frames of the same size are used.
+"""
+
+import time
+import cv2
+import numpy as np
+import pandas as pd
+import torch
+from ultralytics import YOLO
+from batched_inference import predict_batched
+
+# --- Config ---
+VIDEO_PATH = "game1_highlights.mp4"
+MODEL_PATH = "yolov8n.pt"
+FRAME_SIZE = (1280, 720)           # same resize as game7/track_players.py
+N_FRAMES = 64                      # frames per timed run
+BATCH_SIZES = [1, 2, 4, 8, 16]
+WARMUP_BATCHES = 2
+OUTPUT_CSV = "batch_benchmark.csv"
+
+
+def load_frames(path, n_frames):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while cap.isOpened() and len(frames) < n_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.resize(frame, FRAME_SIZE))
+    cap.release()
+
+    if not frames:
+        print(f"⚠️  Could not read {path} — using random frames instead")
+        rng = np.random.default_rng(0)
+        w, h = FRAME_SIZE
+        frames = [rng.integers(0, 255, (h, w, 3), dtype=np.uint8) for _ in range(n_frames)]
+    return frames
+
+
+def time_batch_size(model, frames, batch_size):
+    # Warm up so one-off allocations don't count against small batch sizes
+    warmup = [(i, f) for i, f in enumerate(frames[:batch_size * WARMUP_BATCHES])]
+    for _ in predict_batched(model, warmup, batch_size):
+        pass
+
+    start = time.perf_counter()
+    n = sum(1 for _ in predict_batched(model, enumerate(frames), batch_size))
+    elapsed = time.perf_counter() - start
+    return n, elapsed
+
+
+def main():
+    print("🏀 Batched Inference Benchmark")
+    print(f"🧵 torch threads: {torch.get_num_threads()}")
+
+    model = YOLO(MODEL_PATH)
+    frames = load_frames(VIDEO_PATH, N_FRAMES)
+    print(f"🎞️  {len(frames)} frames at {FRAME_SIZE[0]}x{FRAME_SIZE[1]}")
+
+    rows = []
+    for batch_size in BATCH_SIZES:
+        n, elapsed = time_batch_size(model, frames, batch_size)
+        rows.append({
+            "batch_size": batch_size,
+            "frames": n,
+            "seconds": elapsed,
+            "fps": n / elapsed,
+            "ms_per_frame": 1000 * elapsed / n,
+        })
+        print(f"   batch={batch_size:<3} {n / elapsed:7.2f} fps  ({1000 * elapsed / n:.1f} ms/frame)")
+
+    results = pd.DataFrame(rows)
+    results["speedup"] = results["fps"] / results["fps"].iloc[0]  # relative to BATCH_SIZES[0]
+    results.to_csv(OUTPUT_CSV, index=False)
+
+    best = results.loc[results["fps"].idxmax()]
+    print(f"\n✅ Best batch size: {int(best['batch_size'])} ({best['fps']:.2f} fps)")
+    print(f"📄 Results saved to {OUTPUT_CSV}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Benchmark every pipeline stage on synthetic data (synthetic_data.py).
+
+Each stage times the core function behind a pipeline script on seeded
+detections / features at 10k, 1M and 10M rows, or on a tiny synthetic video
+with a stub detector, and records its peak traced memory in a separate pass.
+Results go to benchmarks/latest.json and are compared with a saved
+baseline, so a slowdown shows up as a ratio instead of a feeling. Nothing
+needs a model download, a GPU or a real game.
+
+Usage:
+    python benchmark_suite.py                         # every stage at every size
+    python benchmark_suite.py --sizes 10k 1M          # skip the 10M-row run
+    python benchmark_suite.py --stages shot_features movement_features
+    python benchmark_suite.py --save-baseline         # store this run as the baseline
+    python benchmark_suite.py --check                 # exit 1 when a stage regressed
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import cv2
+import numpy as np
+import pandas as pd
+from columnar_store import read_table, write_table
+from density import binned_kde
+from inference_cache import InferenceCache, cached_detections
+from kinematics import movement_features
+from possession_stats import frame_spread, assign_possessions, summarize_possessions
+from shot_features import shot_features
+from shot_locations import shot_locations
+from synthetic_data import StubDetector, VIDEO_SIZE, synthetic_detections, synthetic_features, synthetic_video
+from tracker import track_detections
+from video_io import sample_frames
+from zones import fit_zones
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "game7"))
+from possession_segmenter import frame_aggregates, PossessionSegmenter
+
+# --- Config ---
+SIZES = {"10k": 10_000, "1M": 1_000_000, "10M": 10_000_000}
+REPEATS = {"10k": 5, "1M": 3, "10M": 1, "video": 3}   # timed runs per stage; the minimum is compared
+RESULTS_DIR = "benchmarks"
+LATEST_JSON = "latest.json"
+BASELINE_JSON = "baseline.json"
+TIME_TOLERANCE = 1.25      # slower than baseline × this is a regression...
+NOISE_S = 0.01             # ...unless it's within this many seconds (timer noise on tiny runs)
+MEMORY_TOLERANCE = 1.25
+NOISE_MB = 1.0
+RAW_COLUMNS = ["frame", "label", "conf", "x1", "y1", "x2", "y2"]
+KDE_GRID = (np.linspace(0, 50, 500), np.linspace(0, 47, 470))   # heatmap_generator.py's grid
+
+
+# --- Stages ---
+def _store(df, tmp, name):
+    return write_table(df, os.path.join(tmp, name), export_csv=False)
+
+
+def _raw_store(df, tmp):
+    """Raw detection table as a columnar store, which fit_zones streams chunk by chunk."""
+    return _store(df[RAW_COLUMNS], tmp, "zones_detections")
+
+
+def _possessions(df):
+    stats = assign_possessions(frame_spread(df["frame"], df["cx"], df["cy"]))
+    return summarize_possessions(stats)
+
+
+def _segment(features):
+    return list(PossessionSegmenter().segment(frame_aggregates(features)))
+
+
+def _video_frames(path, skip_decode=None):
+    return sample_frames(cv2.VideoCapture(path), skip_decode=skip_decode)
+
+
+def _decode(path):
+    return sum(1 for _ in _video_frames(path))
+
+
+def _detect(path):
+    return sum(len(boxes) for _, boxes in cached_detections(StubDetector(), _video_frames(path), None))
+
+
+def _warm_inference_cache(path, tmp):
+    cache_dir = os.path.join(tmp, "inference_cache")
+    cache = InferenceCache(path, StubDetector(), VIDEO_SIZE, cache_dir=cache_dir)
+    for _ in cached_detections(StubDetector(), _video_frames(path), cache):
+        pass
+    cache.close(report=False)
+    return path, cache_dir
+
+
+def _cached_rerun(prepared):
+    path, cache_dir = prepared
+    model = StubDetector()
+    cache = InferenceCache(path, model, VIDEO_SIZE, cache_dir=cache_dir)
+    n = sum(len(boxes) for _, boxes in cached_detections(model, _video_frames(path, cache.has), cache))
+    cache.close(report=False)
+    return n
+
+
+# name, the script whose core it times, input ("detections", "features" or "video"),
+# optional untimed prepare(data, tmp) whose result is passed to run, optional row cap
+STAGES = [
+    {"name": "track_detections", "script": "game7/track_players.py", "data": "detections",
+     "run": track_detections, "max_rows": 1_000_000},
+    {"name": "movement_features", "script": "game7/extract_features.py", "data": "detections",
+     "run": movement_features},
+    {"name": "segment_possessions", "script": "game7/segment_possessions.py", "data": "features",
+     "run": _segment},
+    {"name": "possession_stats", "script": "possession_tracker.py", "data": "detections",
+     "run": _possessions},
+    {"name": "binned_kde", "script": "heatmap_generator.py", "data": "detections",
+     "run": lambda df: binned_kde(df["x_norm"].to_numpy(), df["y_norm"].to_numpy(), *KDE_GRID)},
+    {"name": "fit_zones", "script": "heatmap_generator.py", "data": "detections",
+     "prepare": _raw_store, "run": lambda path: fit_zones([path]), "max_rows": 1_000_000},
+    {"name": "shot_locations", "script": "shot_chart.py", "data": "detections",
+     "run": shot_locations},
+    {"name": "shot_features", "script": "shot_difficulty_model.py", "data": "detections",
+     "run": shot_features},
+    {"name": "columnar_write", "script": "columnar_store.py", "data": "detections",
+     "prepare": lambda df, tmp: (df, tmp), "run": lambda p: _store(p[0], p[1], "write")},
+    {"name": "columnar_read", "script": "columnar_store.py", "data": "detections",
+     "prepare": lambda df, tmp: _store(df, tmp, "read"), "run": read_table},
+    {"name": "video_decode", "script": "video_io.py", "data": "video", "run": _decode},
+    {"name": "stub_detection", "script": "detect_and_log.py", "data": "video", "run": _detect},
+    {"name": "cached_rerun", "script": "inference_cache.py", "data": "video",
+     "prepare": _warm_inference_cache, "run": _cached_rerun},
+]
+
+
+# --- Measuring ---
+def measure(run, arg, repeat, memory=True):
+    """Min / median wall time over `repeat` runs, plus peak traced MB from one extra run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(arg)
+        times.append(time.perf_counter() - start)
+    result = {"min_s": min(times), "median_s": statistics.median(times), "repeat": repeat}
+    if memory:
+        tracemalloc.start()
+        try:
+            run(arg)
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def make_data(kind, n_rows, tmp):
+    if kind == "detections":
+        return synthetic_detections(n_rows)
+    if kind == "features":
+        return synthetic_features(n_rows)
+    path = os.path.join(tmp, "synthetic.avi")
+    synthetic_video(path)
+    return path
+
+
+def run_suite(stages, sizes, memory=True):
+    """Run each stage at each size (video stages once); returns {"stage@size": result}."""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="nba_bench_") as tmp:
+        groups = [(size, SIZES[size]) for size in sizes]
+        if any(stage["data"] == "video" for stage in stages):
+            groups.append(("video", None))
+        for size, n_rows in groups:
+            data = {}
+            for stage in stages:
+                if (stage["data"] == "video") != (size == "video"):
+                    continue
+                if n_rows is not None and n_rows > stage.get("max_rows", n_rows):
+                    print(f"   ⏭️  {stage['name']:<20} {size:>5}  skipped (over {stage['max_rows']:,} rows)")
+                    continue
+                if stage["data"] not in data:
+                    data[stage["data"]] = make_data(stage["data"], n_rows, tmp)
+                arg = data[stage["data"]]
+                stage_tmp = os.path.join(tmp, stage["name"])
+                os.makedirs(stage_tmp, exist_ok=True)
+                if "prepare" in stage:
+                    arg = stage["prepare"](arg, stage_tmp)
+
+                result = measure(stage["run"], arg, REPEATS[size], memory)
+                result["rows"] = len(data[stage["data"]]) if n_rows is not None else None
+                results[f"{stage['name']}@{size}"] = result
+                shutil.rmtree(stage_tmp, ignore_errors=True)
+                peak = f"{result['peak_mb']:8.1f} MB" if "peak_mb" in result else ""
+                print(f"   {stage['name']:<20} {size:>5}  {1000 * result['min_s']:10.1f} ms  {peak}")
+    return results
+
+
+# --- Baseline ---
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "machine": machine_info(),
+                   "results": results}, f, indent=1)
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline):
+    """Table of time / memory ratios against the baseline; `regressed` marks stages over tolerance."""
+    rows = []
+    for key, result in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        row = {"stage": key, "time_ratio": result["min_s"] / max(base["min_s"], 1e-9), "regressed": False}
+        if result["min_s"] > base["min_s"] * TIME_TOLERANCE + NOISE_S:
+            row["regressed"] = True
+        if "peak_mb" in result and "peak_mb" in base:
+            row["memory_ratio"] = result["peak_mb"] / max(base["peak_mb"], 1e-9)
+            if result["peak_mb"] > base["peak_mb"] * MEMORY_TOLERANCE + NOISE_MB:
+                row["regressed"] = True
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES), help="row counts to run")
+    parser.add_argument("--stages", nargs="+", choices=[s["name"] for s in STAGES], help="only these stages")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any stage regressed")
+    parser.add_argument("--dir", default=RESULTS_DIR, help="where results and the baseline are kept")
+    args = parser.parse_args()
+
+    stages = [s for s in STAGES if args.stages is None or s["name"] in args.stages]
+    print("🏀 Pipeline Benchmark Suite (synthetic data)")
+    print(f"🖥️  {machine_info()['processor']}, {os.cpu_count()} CPUs, Python {platform.python_version()}")
+    results = run_suite(stages, args.sizes, memory=not args.no_memory)
+
+    latest = os.path.join(args.dir, LATEST_JSON)
+    baseline_path = os.path.join(args.dir, BASELINE_JSON)
+    save_results(results, latest)
+    print(f"\n📄 Results saved to {latest}")
+    if args.save_baseline:
+        save_results(results, baseline_path)
+        print(f"📌 Saved as the baseline → {baseline_path}")
+        return
+
+    baseline = load_results(baseline_path)
+    if baseline is None:
+        print(f"ℹ️  No baseline yet; run with --save-baseline to store one in {baseline_path}")
+        return
+    if baseline["machine"] != machine_info():
+        print(f"⚠️  Baseline is from a different machine/setup ({baseline['machine']['processor']}, "
+              f"{baseline['machine']['cpus']} CPUs); ratios are only indicative")
+    table = compare(results, baseline)
+    if table.empty:
+        print("ℹ️  No stages in common with the baseline")
+        return
+    print(f"\n📊 Against the baseline from {baseline['created']} (min time, peak memory):")
+    for row in table.itertuples():
+        memory = f"  mem {row.memory_ratio:5.2f}x" if "memory_ratio" in table and not np.isnan(row.memory_ratio) else ""
+        flag = "  ❌ regressed" if row.regressed else ""
+        print(f"   {row.stage:<28} time {row.time_ratio:5.2f}x{memory}{flag}")
+
+    regressed = int(table["regressed"].sum())
+    if regressed:
+        print(f"\n❌ {regressed} stage(s) regressed beyond {TIME_TOLERANCE:.2f}x time / {MEMORY_TOLERANCE:.2f}x memory")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
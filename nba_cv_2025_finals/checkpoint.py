@@ -0,0 +1,158 @@
+# checkpoint.py
+"""
+Streaming, resumable output for long detection runs.
+
+Rows are buffered in memory only until FLUSH_FRAMES frames have been
+processed, then appended to the columnar store as a new chunk. After every
+flush a checkpoint is written next to the store manifest:
+
+    game1_detections.cols/checkpoint.json
+        params      run settings (video, model, thresholds...) the rows depend on
+        last_frame  last frame whose rows are safely on disk
+        state       caller state to restore on resume (e.g. tracker tracks)
+        complete    True once the whole video has been processed
+
+Rerunning with the same params resumes after `last_frame`; chunks written
+after the last checkpoint (a crash between the two writes) are dropped first.
+Memory stays flat however long the video is.
+"""
+
+import json
+import os
+import shutil
+import pandas as pd
+from columnar_store import (append_table, export_csv, has_store, read_manifest,
+                            store_path, truncate_table, csv_path, EXPORT_CSV, MANIFEST)
+
+FLUSH_FRAMES = 900   # flush every 30s of 30fps video
+CHECKPOINT = "checkpoint.json"
+
+
+class CheckpointWriter:
+    """
+    Buffered, checkpointed writer for one output table.
+
+    - path: output table (e.g. 'game1_detections.csv')
+    - params: JSON-serializable settings; a checkpoint with different params is discarded
+    - state: optional callable returning JSON-serializable state saved with each checkpoint
+    - prepare: optional callable applied to each flushed DataFrame (e.g. to add columns)
+    - columns: optional {name: dtype} of the final table, written header-only if no rows were added
+    - resume: False always starts over
+    """
+
+    def __init__(self, path, params, flush_frames=FLUSH_FRAMES, state=None, prepare=None,
+                 columns=None, resume=True, export_csv=EXPORT_CSV):
+        self.path = path
+        self.root = store_path(path)
+        self.params = json.loads(json.dumps(params))  # normalize (tuples → lists) for comparison
+        self.flush_frames = flush_frames
+        self.state_fn = state
+        self.prepare = prepare
+        self.columns = columns
+        self.export_csv = export_csv
+        self.rows = []
+        self.last_frame = None        # last frame on disk
+        self.flushed_through = None   # last frame passed to frame_done at the last flush
+        self.seen_frame = None        # last frame passed to frame_done
+        self.saved_state = None
+        self.complete = False
+        self.total_rows = 0
+
+        checkpoint = self._read_checkpoint() if resume else None
+        if checkpoint is not None and checkpoint["params"] == self.params:
+            self.last_frame = checkpoint["last_frame"]
+            self.saved_state = checkpoint.get("state")
+            self.complete = checkpoint.get("complete", False)
+            if self.last_frame is not None:
+                truncate_table(self.root, self.last_frame)
+            self.total_rows = sum(c["rows"] for c in read_manifest(self.root)["chunks"]) if has_store(self.root) else 0
+        else:
+            if checkpoint is not None:
+                print(f"⚠️  Settings changed since the last run — starting {self.path} over")
+            self._reset()
+        self.flushed_through = self.last_frame
+
+    @property
+    def resume_frame(self):
+        """First frame that still needs processing (0 for a fresh run)."""
+        return 0 if self.last_frame is None else self.last_frame + 1
+
+    # --- Checkpoint file ---
+    def _checkpoint_path(self):
+        return os.path.join(self.root, CHECKPOINT)
+
+    def _read_checkpoint(self):
+        if not os.path.exists(self._checkpoint_path()):
+            return None
+        with open(self._checkpoint_path()) as f:
+            return json.load(f)
+
+    def _write_checkpoint(self):
+        os.makedirs(self.root, exist_ok=True)
+        checkpoint = {
+            "params": self.params,
+            "last_frame": self.last_frame,
+            "rows": self.total_rows,
+            "state": self.state_fn() if self.state_fn is not None else None,
+            "complete": self.complete,
+        }
+        tmp = self._checkpoint_path() + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, self._checkpoint_path())  # atomic
+
+    def _reset(self):
+        if os.path.isdir(self.root):
+            if not has_store(self.root) and not os.path.exists(self._checkpoint_path()):
+                raise FileExistsError(f"{self.root} exists and is not a columnar store")
+            shutil.rmtree(self.root)
+        self.last_frame = None
+        self.saved_state = None
+        self.complete = False
+        self.total_rows = 0
+
+    def touch(self):
+        """Bump the finished output's mtime, so a rerun with nothing to do still counts as fresh."""
+        for path in (os.path.join(self.root, MANIFEST), csv_path(self.path)):
+            if os.path.exists(path):
+                os.utime(path)
+
+    # --- Writing ---
+    def add(self, row):
+        """Buffer one output row (a dict)."""
+        self.rows.append(row)
+
+    def frame_done(self, frame):
+        """Mark `frame` fully processed; flushes every flush_frames frames."""
+        self.seen_frame = frame
+        since = frame - (self.flushed_through if self.flushed_through is not None else -1)
+        if since >= self.flush_frames:
+            self.flush(frame)
+
+    def flush(self, frame):
+        """Append buffered rows and checkpoint `frame` as the last completed frame."""
+        if self.rows:
+            df = pd.DataFrame(self.rows)
+            if self.prepare is not None:
+                df = self.prepare(df)
+            append_table(df, self.root)
+            self.total_rows += len(df)
+            self.rows = []
+        self.last_frame = int(frame)
+        self.flushed_through = int(frame)
+        self._write_checkpoint()
+
+    def close(self, frame=None):
+        """Flush the tail, mark the run complete and (optionally) export the CSV."""
+        last = frame if frame is not None else self.seen_frame
+        if last is not None and (self.rows or last != self.flushed_through):
+            self.flush(last)
+        if not has_store(self.root) and self.columns is not None:
+            # Nothing detected: still leave an empty table so readers find the file
+            empty = pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in self.columns.items()})
+            append_table(empty, self.root)
+        self.complete = True
+        self._write_checkpoint()
+        if self.export_csv and has_store(self.root):
+            export_csv(self.root)
+        return csv_path(self.path) if self.export_csv else self.root
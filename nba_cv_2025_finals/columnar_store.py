@@ -0,0 +1,313 @@
+# columnar_store.py
+"""
+Columnar, memory-mappable storage for per-frame tables (detections, features).
+
+A table saved as `game1_detections.csv` lives next to it in a
+`game1_detections.cols/` directory:
+
+    manifest.json                column dtypes, categories and chunk index
+    00000/frame.npy, x1.npy...   one typed .npy file per column, per chunk
+
+Rows are sorted by frame and split into chunks of CHUNK_FRAMES frames, so a
+reader touching a frame range only opens the chunks that overlap it, and only
+the columns it asks for. Columns are memory-mapped, never parsed.
+
+Usage:
+    python columnar_store.py game1_detections.csv   # convert existing CSVs
+"""
+
+import json
+import os
+import shutil
+import sys
+import numpy as np
+import pandas as pd
+
+STORE_SUFFIX = ".cols"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+CHUNK_FRAMES = 9000    # 5 minutes of 30fps video per chunk
+EXPORT_CSV = True      # also write the human-readable CSV next to the store
+CSV_CHUNK_ROWS = 500_000  # rows parsed per step when streaming a CSV with no store
+INT_COLUMNS = {"frame", "player_id", "possession_id", "zone"}  # always int32
+
+
+def store_path(path):
+    """'game1_detections.csv' / 'game1_detections' → 'game1_detections.cols'"""
+    path = str(path)
+    if path.endswith(STORE_SUFFIX):
+        return path
+    root, ext = os.path.splitext(path)
+    return (root if ext == ".csv" else path) + STORE_SUFFIX
+
+
+def csv_path(path):
+    path = str(path)
+    if path.endswith(STORE_SUFFIX):
+        return path[:-len(STORE_SUFFIX)] + ".csv"
+    return path if path.endswith(".csv") else path + ".csv"
+
+
+def has_store(path):
+    return os.path.exists(os.path.join(store_path(path), MANIFEST))
+
+
+def table_columns(path):
+    """Column names of a stored table (store manifest, else CSV header)."""
+    if has_store(path):
+        return list(read_manifest(path)["columns"])
+    return list(pd.read_csv(csv_path(path), nrows=0).columns)
+
+
+# --- Schema ---
+def _column_spec(name, series):
+    if name in INT_COLUMNS or pd.api.types.is_integer_dtype(series):
+        return {"dtype": "int32"}
+    if pd.api.types.is_bool_dtype(series):
+        return {"dtype": "bool"}
+    if pd.api.types.is_numeric_dtype(series):
+        return {"dtype": "float32"}
+    return {"dtype": "int16", "categories": []}  # strings → category codes
+
+
+def _encode(series, spec):
+    if "categories" not in spec:
+        return series.to_numpy(dtype=spec["dtype"])
+    categories = spec["categories"]
+    lookup = {c: i for i, c in enumerate(categories)}
+    codes, uniques = pd.factorize(series.astype(str))
+    for value in uniques:
+        if value not in lookup:
+            lookup[value] = len(categories)
+            categories.append(value)
+    remap = np.array([lookup[value] for value in uniques], dtype=spec["dtype"])
+    return remap[codes]
+
+
+def _decode(values, spec):
+    if "categories" not in spec:
+        return values
+    return pd.Categorical.from_codes(np.asarray(values), categories=spec["categories"])
+
+
+def _typed(df):
+    """Cast a DataFrame parsed from CSV to the store's column types."""
+    for name in df.columns:
+        spec = _column_spec(name, df[name])
+        if "categories" in spec:
+            df[name] = df[name].astype("category")
+        else:
+            df[name] = df[name].astype(spec["dtype"])
+    return df
+
+
+# --- Manifest ---
+def read_manifest(path):
+    with open(os.path.join(store_path(path), MANIFEST)) as f:
+        return json.load(f)
+
+
+def _write_manifest(root, manifest):
+    tmp = os.path.join(root, MANIFEST + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, os.path.join(root, MANIFEST))  # atomic: readers never see half a manifest
+
+
+def _new_manifest(df):
+    return {
+        "version": FORMAT_VERSION,
+        "columns": {name: _column_spec(name, df[name]) for name in df.columns},
+        "chunks": [],
+    }
+
+
+# --- Writing ---
+def append_table(df, path, chunk_frames=CHUNK_FRAMES):
+    """Append rows to a store (created if missing) as one or more new chunks."""
+    root = store_path(path)
+    os.makedirs(root, exist_ok=True)
+    manifest = read_manifest(root) if has_store(root) else _new_manifest(df)
+    columns = manifest["columns"]
+
+    missing = set(columns) ^ set(df.columns)
+    if manifest["chunks"] and missing:
+        raise ValueError(f"Columns do not match store {root}: {sorted(missing)}")
+    if df.empty:
+        _write_manifest(root, manifest)
+        return manifest
+
+    df = df.sort_values("frame", kind="stable")
+    frames = df["frame"].to_numpy(dtype=np.int64)
+    bins = (frames - frames[0]) // chunk_frames
+    bounds = np.flatnonzero(np.diff(bins)) + 1
+    starts = np.concatenate([[0], bounds])
+    stops = np.concatenate([bounds, [len(df)]])
+
+    next_id = manifest["chunks"][-1]["id"] + 1 if manifest["chunks"] else 0
+    for chunk_id, (lo, hi) in enumerate(zip(starts, stops), start=next_id):
+        part = df.iloc[lo:hi]
+        name = f"{chunk_id:05d}"
+        os.makedirs(os.path.join(root, name), exist_ok=True)
+        for col, spec in columns.items():
+            np.save(os.path.join(root, name, f"{col}.npy"), _encode(part[col], spec))
+        manifest["chunks"].append({
+            "id": chunk_id,
+            "name": name,
+            "start_frame": int(frames[lo]),
+            "end_frame": int(frames[hi - 1]),
+            "rows": int(hi - lo),
+        })
+
+    _write_manifest(root, manifest)
+    return manifest
+
+
+def write_table(df, path, chunk_frames=CHUNK_FRAMES, export_csv=EXPORT_CSV):
+    """Write `df` as a fresh store (replacing any previous one) and optionally as CSV."""
+    root = store_path(path)
+    if os.path.isdir(root):
+        if not has_store(root):
+            raise FileExistsError(f"{root} exists and is not a columnar store")
+        shutil.rmtree(root)
+    append_table(df, root, chunk_frames)
+    if export_csv:
+        df.to_csv(csv_path(path), index=False)
+    return root
+
+
+def truncate_table(path, last_frame):
+    """
+    Drop whole chunks that start after `last_frame` (e.g. written after the
+    last checkpoint). Chunks straddling `last_frame` are kept as they are.
+    """
+    root = store_path(path)
+    if not has_store(root):
+        return None
+    manifest = read_manifest(root)
+    dropped = [c for c in manifest["chunks"] if c["start_frame"] > last_frame]
+    if dropped:
+        manifest["chunks"] = [c for c in manifest["chunks"] if c["start_frame"] <= last_frame]
+        _write_manifest(root, manifest)
+        for chunk in dropped:
+            shutil.rmtree(os.path.join(root, chunk["name"]), ignore_errors=True)
+    return manifest
+
+
+def export_csv(path):
+    """Write the store's CSV one chunk at a time (memory bounded by chunk size)."""
+    root = store_path(path)
+    manifest = read_manifest(root)
+    out = csv_path(path)
+    tmp = out + ".tmp"
+    with open(tmp, "w", newline="") as f:
+        f.write(",".join(manifest["columns"]) + "\n")
+        for chunk in manifest["chunks"]:
+            part = {}
+            for col, spec in manifest["columns"].items():
+                values = np.load(os.path.join(root, chunk["name"], f"{col}.npy"), mmap_mode="r")
+                part[col] = _decode(np.asarray(values), spec)
+            pd.DataFrame(part).to_csv(f, header=False, index=False)
+    os.replace(tmp, out)
+    return out
+
+
+# --- Reading ---
+def _chunks_in_range(manifest, frames):
+    if frames is None:
+        return manifest["chunks"]
+    start, stop = frames
+    return [
+        c for c in manifest["chunks"]
+        if (stop is None or c["start_frame"] < stop) and (start is None or c["end_frame"] >= start)
+    ]
+
+
+def read_columns(path, columns=None, frames=None):
+    """
+    Return {column: array} for the requested columns and frame range.
+
+    `frames` is a half-open (start, stop) range; either end may be None.
+    Within a chunk the rows for a frame range are contiguous, so each piece is
+    a zero-copy memory-mapped slice; pieces from several chunks are concatenated.
+    """
+    root = store_path(path)
+    manifest = read_manifest(root)
+    columns = list(manifest["columns"]) if columns is None else list(columns)
+    unknown = [c for c in columns if c not in manifest["columns"]]
+    if unknown:
+        raise KeyError(f"Columns not in {root}: {unknown}")
+
+    pieces = {col: [] for col in columns}
+    for chunk in _chunks_in_range(manifest, frames):
+        chunk_dir = os.path.join(root, chunk["name"])
+        lo, hi = 0, chunk["rows"]
+        if frames is not None:
+            frame_col = np.load(os.path.join(chunk_dir, "frame.npy"), mmap_mode="r")
+            start, stop = frames
+            if start is not None:
+                lo = int(np.searchsorted(frame_col, start, side="left"))
+            if stop is not None:
+                hi = int(np.searchsorted(frame_col, stop, side="left"))
+        for col in columns:
+            pieces[col].append(np.load(os.path.join(chunk_dir, f"{col}.npy"), mmap_mode="r")[lo:hi])
+
+    out = {}
+    for col in columns:
+        spec = manifest["columns"][col]
+        parts = pieces[col]
+        if not parts:
+            values = np.empty(0, dtype=spec["dtype"])
+        elif len(parts) == 1:
+            values = parts[0]
+        else:
+            values = np.concatenate(parts)
+        out[col] = _decode(values, spec)
+    return out
+
+
+def read_table(path, columns=None, frames=None):
+    """
+    Load a table as a DataFrame, preferring the columnar store over the CSV.
+
+    Falls back to parsing `<name>.csv` (only `columns`) when no store exists,
+    so scripts work unchanged on older outputs.
+    """
+    if has_store(path):
+        return pd.DataFrame(read_columns(path, columns, frames), copy=False)
+
+    return select_frames(_typed(pd.read_csv(csv_path(path), usecols=columns)), frames)
+
+
+def read_csv_chunks(path, columns=None, chunksize=CSV_CHUNK_ROWS):
+    """Parse a table's CSV in typed pieces of `chunksize` rows (for sources with no store)."""
+    for part in pd.read_csv(csv_path(path), usecols=columns, chunksize=chunksize):
+        yield _typed(part)
+
+
+def select_frames(df, frames):
+    """Rows of an in-memory table within a half-open (start, stop) frame range."""
+    if frames is None:
+        return df
+    start, stop = frames
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= df["frame"].to_numpy() >= start
+    if stop is not None:
+        mask &= df["frame"].to_numpy() < stop
+    return df[mask].reset_index(drop=True)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python columnar_store.py <table.csv> [more.csv ...]")
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        df = pd.read_csv(path)
+        root = write_table(df, path, export_csv=False)
+        manifest = read_manifest(root)
+        print(f"✅ {path} → {root} ({len(df):,} rows, {len(manifest['chunks'])} chunks)")
+
+
+if __name__ == "__main__":
+    main()
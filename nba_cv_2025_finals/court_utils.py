@@ -1,6 +1,10 @@
 # court_utils.py
+from functools import lru_cache
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 def draw_halfcourt(ax, title="NBA Halfcourt"):
     # Court layout
@@ -17,4 +21,33 @@ def draw_halfcourt(ax, title="NBA Halfcourt"):
     ax.set_ylim(0, 47)
     ax.set_aspect(1)
     ax.axis('off')
-    ax.set_title(title, fontsize=14)
\ No newline at end of file
+    ax.set_title(title, fontsize=14)
+
+# --- Cached court background ---
+COURT_PX_PER_FT = 20  # raster resolution of the cached court lines
+
+
+@lru_cache(maxsize=None)
+def court_background(px_per_ft=COURT_PX_PER_FT):
+    """Halfcourt lines rendered once to a transparent RGBA array (cached per process)."""
+    dpi = 100
+    fig = Figure(figsize=(50 * px_per_ft / dpi, 47 * px_per_ft / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    fig.patch.set_alpha(0)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.patch.set_alpha(0)
+    draw_halfcourt(ax, title="")
+    canvas.draw()
+    image = np.asarray(canvas.buffer_rgba()).copy()
+    image.flags.writeable = False
+    return image
+
+
+def draw_court_background(ax, title="NBA Halfcourt", zorder=3):
+    """Like draw_halfcourt, but blits the cached court image instead of rebuilding patches."""
+    ax.imshow(court_background(), extent=(0, 50, 0, 47), zorder=zorder, interpolation="antialiased")
+    ax.set_xlim(0, 50)
+    ax.set_ylim(0, 47)
+    ax.set_aspect(1)
+    ax.axis('off')
+    ax.set_title(title, fontsize=14)
@@ -1,45 +1,154 @@
 import cv2
-from ultralytics import YOLO
-import pandas as pd
+import sys
 from tqdm import tqdm
+from frame_pipeline import FramePipeline
+from checkpoint import CheckpointWriter
+from columnar_store import store_path
+from detectors import load_detector
+from inference_cache import InferenceCache, cached_detect
+from run_profiler import RunProfiler
+from sharded_detection import sharded_detections
+from video_io import FrameReader, MotionSampler, adaptive_frames, sample_frames
+
+# --- Config ---
+MODEL_PATH = 'yolov8n.pt'
+BACKEND = 'ultralytics'   # or 'onnx' / 'openvino' (exported on first use, see detectors.py)
+PRECISION = 'fp32'        # 'int8' (onnx, openvino) or 'fp16' (openvino) for faster CPU inference
+video_path = 'game1_highlights.mp4'
+OUTPUT_CSV = 'game1_detections.csv'
+start_seconds = 88   # Skip first 1:28 (88 seconds)
+QUEUE_SIZE = 32      # Frames buffered between stages (bounds memory, applies backpressure)
+FLUSH_FRAMES = 900   # Frames between checkpointed flushes to disk
+RESUME = True        # Continue an interrupted run from its last checkpoint
+USE_INFERENCE_CACHE = True  # Reuse detections from earlier runs on the same video + model
+JOBS = 1             # Worker processes; >1 splits the video into frame ranges run in parallel
+ADAPTIVE_SAMPLING = False  # Motion-dependent stride; off because heatmaps, zones, shots and possessions
+                           # weight every CSV row as one frame, and cached reruns then skip decoding
+MIN_STEP = 2         # Stride during action (15 fps)
+MAX_STEP = 12        # Stride when play is static; keep <= possession_tracker's 15-frame gap
+PROFILE = False      # Per-stage timings + counters → profiles/detect_and_log_<time>.json
+PROFILE_MODE = None  # With PROFILE: 'cprofile' or 'tracemalloc' for function / allocation detail
+
+profiler = RunProfiler("detect_and_log", enabled=PROFILE, mode=PROFILE_MODE,
+                       params={"video": video_path, "backend": BACKEND, "precision": PRECISION, "jobs": JOBS})
 
 # Load model
-model = YOLO('yolov8n.pt')
+with profiler.stage("load_model"):
+    model = profiler.timed_model(load_detector(MODEL_PATH, BACKEND, PRECISION), "inference")
 
 # Load video
-video_path = 'game1_highlights.mp4'
 cap = cv2.VideoCapture(video_path)
 fps = cap.get(cv2.CAP_PROP_FPS)
+total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+# Detections stream to disk every FLUSH_FRAMES frames; a rerun picks up after the last checkpoint
+writer = CheckpointWriter(
+    OUTPUT_CSV,
+    params={"video": video_path, "model": MODEL_PATH, "backend": BACKEND, "precision": PRECISION,
+            "start_seconds": start_seconds, "labels": ["person"],
+            "sampling": [MIN_STEP, MAX_STEP] if ADAPTIVE_SAMPLING else 1},
+    flush_frames=FLUSH_FRAMES, resume=RESUME,
+    columns={"frame": "int32", "label": "category", "conf": "float32",
+             "x1": "float32", "y1": "float32", "x2": "float32", "y2": "float32"},
+)
+if writer.complete:
+    writer.touch()  # run_all.py compares mtimes: the output is current for this script
+    print(f"✅ {store_path(OUTPUT_CSV)} is already complete ({writer.total_rows:,} detections)")
+    sys.exit(0)
+
+start_frame = max(int(start_seconds * fps), writer.resume_frame)
+if writer.last_frame is not None:
+    print(f"⏩ Resuming after frame {writer.last_frame} ({writer.total_rows:,} detections on disk)")
+if not ADAPTIVE_SAMPLING:
+    profiler.count("frames_expected", max(total_frames - start_frame, 0))  # container estimate
+sampler = MotionSampler(MIN_STEP, MAX_STEP) if ADAPTIVE_SAMPLING else None
+
+# Frames detected by an earlier run on the same video + weights are read back instead of re-run
+frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+# (sharded runs open it in each worker instead)
+cache = InferenceCache(video_path, model, frame_size) if USE_INFERENCE_CACHE and JOBS == 1 else None
+reread = FrameReader(video_path)  # decodes skipped frames whose cache block was evicted meanwhile
+
+
+# --- Pipeline stages ---
+def decode_frames(cap, first_frame):
+    """Decode stage: yield (frame_idx, (frame_idx, frame)) using the real frame number.
+
+    With ADAPTIVE_SAMPLING only the frames the motion sampler picks are
+    passed on. Otherwise every frame is, and frames already in the inference
+    cache are not decoded (frame is None).
+    """
+    if sampler is not None:
+        frames = adaptive_frames(cap, sampler, first_frame)
+    else:
+        frames = sample_frames(cap, 1, first_frame, skip_decode=cache.has if cache is not None else None)
+    for frame_idx, frame in profiler.timed(frames, "decode"):
+        yield frame_idx, (frame_idx, frame)  # the inference stage needs the id for cache lookups
+
+
+def detect(item):
+    """Inference stage: raw [x1, y1, x2, y2, conf, cls] rows for one frame."""
+    frame_idx, frame = item
+    return cached_detect(model, cache, frame_idx, frame, reread).tolist()
+
+
+progress = tqdm(total=max(total_frames - start_frame, 0), unit="frame")
+
+
+def log_detections(frame_idx, detections):
+    """Write stage: keep person boxes, flushed to disk every FLUSH_FRAMES frames."""
+    with profiler.stage("extract"):
+        rows = []
+        for x1, y1, x2, y2, conf, cls in detections:
+            label = model.names[int(cls)]
+            if label in ['person']:  # We'll add 'sports ball' later if needed
+                rows.append({
+                    'frame': frame_idx,
+                    'label': label,
+                    'conf': conf,
+                    'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2
+                })
+    with profiler.stage("write"):
+        for row in rows:
+            writer.add(row)
+        writer.frame_done(frame_idx)
+    progress.update(frame_idx - start_frame + 1 - progress.n)  # frames covered, sampled or not
+    profiler.count("frames")
+    profiler.count("detections", len(detections))
+    profiler.count("persons", len(rows))
+
+
+if JOBS > 1:
+    # Workers detect frame ranges in parallel; results arrive here in frame order
+    # (their decode + inference shows up as time spent waiting on "workers")
+    detections = sharded_detections(video_path, MODEL_PATH, start_frame, jobs=JOBS, use_cache=USE_INFERENCE_CACHE,
+                                    backend=BACKEND, precision=PRECISION,
+                                    adaptive={"min_step": MIN_STEP, "max_step": MAX_STEP} if ADAPTIVE_SAMPLING else None)
+    try:
+        for frame_idx, boxes in profiler.timed(detections, "workers"):
+            log_detections(frame_idx, boxes.tolist())
+    finally:
+        progress.close()
+        cap.release()
+else:
+    pipeline = FramePipeline(decode_frames(cap, start_frame), detect, log_detections, queue_size=QUEUE_SIZE,
+                             profiler=profiler)
+    try:
+        pipeline.run()
+    finally:
+        progress.close()
+        cap.release()
+        reread.close()
+        if cache is not None:
+            profiler.count("cache_hits", cache.hits)
+            cache.close()
+
+    pipeline.report()
+    if sampler is not None:
+        sampler.report()
+        profiler.count("probes", sampler.probes)
 
-# Skip first 1:28 (88 seconds)
-start_seconds = 88
-start_frame = int(start_seconds * fps)
-cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-
-results = []
-frame_idx = start_frame  # Start from the real frame number
-
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    detections = model(frame)[0]
-    for det in detections.boxes.data.tolist():
-        x1, y1, x2, y2, conf, cls = det
-        label = model.names[int(cls)]
-        if label in ['person']:  # We'll add 'sports ball' later if needed
-            results.append({
-                'frame': frame_idx,
-                'label': label,
-                'conf': conf,
-                'x1': x1, 'y1': y1, 'x2': x2, 'y2': y2
-            })
-
-    frame_idx += 1
-
-cap.release()
-
-df = pd.DataFrame(results)
-df.to_csv('game1_detections.csv', index=False)
-print(f"✅ Done! Detection started at {start_seconds}s and saved to game1_detections.csv")
\ No newline at end of file
+with profiler.stage("export"):
+    writer.close()
+profiler.finish(pipeline=pipeline.summary() if JOBS <= 1 else None)
+print(f"✅ Done! Detection started at {start_seconds}s and saved to {store_path(OUTPUT_CSV)} (+ {OUTPUT_CSV})")
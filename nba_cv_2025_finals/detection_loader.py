@@ -0,0 +1,172 @@
+# detection_loader.py
+"""
+Shared loader for filtered, centroided, court-normalized detections.
+
+Every analysis script needs the same derived table: confident person boxes
+with their centroid (cx, cy) and position on a 50×47 ft halfcourt
+(x_norm, y_norm). The first call builds it and saves it as a columnar store
+under .cache/detections/, keyed by a hash of the source data and the filter
+parameters. Later calls memory-map the cached table, so they load in
+milliseconds and only touch the requested columns.
+
+iter_detections() derives the same rows one frame range at a time straight
+from the source, for passes over tables too large to hold in memory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from columnar_store import (read_table, read_csv_chunks, read_manifest, write_table, select_frames,
+                            has_store, store_path, csv_path, CHUNK_FRAMES)
+
+CACHE_DIR = os.path.join(".cache", "detections")
+DEFAULT_MIN_CONF = 0.6
+DEFAULT_LABELS = ("person",)
+DEFAULT_COURT_SIZE = (1920, 1080)   # video resolution in px (width, height)
+COURT_FEET = (50, 47)               # NBA halfcourt width/height in ft
+_CACHE_VERSION = 1                  # bump when the derived columns change
+_HASH_INDEX = "source_hashes.json"
+_SOURCE_COLUMNS = ["frame", "label", "conf", "x1", "y1", "x2", "y2"]
+
+
+# --- Source fingerprinting ---
+def _source_files(path):
+    """Files that make up a detection table: the columnar store if present, else the CSV."""
+    if has_store(path):
+        root = store_path(path)
+        return sorted(
+            os.path.join(d, f) for d, _, files in os.walk(root) for f in files
+        )
+    return [csv_path(path)]
+
+
+def _stat_signature(files):
+    sig = []
+    for f in files:
+        st = os.stat(f)
+        sig.append([os.path.abspath(f), st.st_size, st.st_mtime_ns])
+    return sig
+
+
+def source_hash(path, cache_dir=CACHE_DIR):
+    """
+    Content hash of a detection table.
+
+    Hashes are memoized against file size + mtime, so unchanged sources are
+    not re-read on every call.
+    """
+    files = _source_files(path)
+    signature = _stat_signature(files)
+    index_path = os.path.join(cache_dir, _HASH_INDEX)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+
+    key = os.path.abspath(store_path(path) if has_store(path) else csv_path(path))
+    entry = index.get(key)
+    if entry and entry["signature"] == signature:
+        return entry["sha1"]
+
+    digest = hashlib.sha1()
+    for f in files:
+        digest.update(os.path.relpath(f, os.path.dirname(key)).encode())
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+
+    index[key] = {"signature": signature, "sha1": digest.hexdigest()}
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, index_path)
+    return index[key]["sha1"]
+
+
+def cache_key(path, min_conf, labels, court_size, cache_dir=CACHE_DIR):
+    params = {
+        "version": _CACHE_VERSION,
+        "source": source_hash(path, cache_dir),
+        "min_conf": min_conf,
+        "labels": sorted(labels) if labels is not None else None,
+        "court_size": list(court_size),
+    }
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# --- Building the derived table ---
+def derive_detections(df, min_conf=DEFAULT_MIN_CONF, labels=DEFAULT_LABELS, court_size=DEFAULT_COURT_SIZE):
+    """Filter, centroid and normalize raw detection rows (a whole table or one chunk of it)."""
+    mask = df["conf"] > min_conf
+    if labels is not None:
+        mask &= df["label"].isin(labels)
+    df = df.loc[mask, ["frame", "conf", "x1", "y1", "x2", "y2"]].reset_index(drop=True)
+
+    width, height = court_size
+    df["cx"] = (df["x1"] + df["x2"]) / 2
+    df["cy"] = (df["y1"] + df["y2"]) / 2
+    df["x_norm"] = df["cx"] / width * COURT_FEET[0]
+    df["y_norm"] = (1 - df["cy"] / height) * COURT_FEET[1]  # invert y
+    return df
+
+
+def build_detections(path, min_conf=DEFAULT_MIN_CONF, labels=DEFAULT_LABELS, court_size=DEFAULT_COURT_SIZE):
+    """Filter, centroid and normalize detections (no caching)."""
+    return derive_detections(read_table(path, columns=_SOURCE_COLUMNS), min_conf, labels, court_size)
+
+
+def iter_detections(path="game1_detections.csv", chunk_frames=CHUNK_FRAMES, min_conf=DEFAULT_MIN_CONF,
+                    labels=DEFAULT_LABELS, court_size=DEFAULT_COURT_SIZE, columns=None):
+    """
+    Yield the rows load_detections() would return, chunk_frames frames at a time.
+
+    Reads the source store one frame range at a time (a CSV-only source in
+    CSV_CHUNK_ROWS-row pieces) and bypasses the derived cache, so memory is
+    bounded by the chunk, not the game. Empty chunks are skipped.
+    """
+    if has_store(path):
+        chunks = read_manifest(path)["chunks"]
+        if not chunks:
+            return
+        first = min(c["start_frame"] for c in chunks)
+        last = max(c["end_frame"] for c in chunks)
+        parts = (read_table(path, columns=_SOURCE_COLUMNS, frames=(start, start + chunk_frames))
+                 for start in range(first, last + 1, chunk_frames))
+    else:
+        parts = read_csv_chunks(path, columns=_SOURCE_COLUMNS)
+    for part in parts:
+        df = derive_detections(part, min_conf, labels, court_size)
+        if len(df):
+            yield df[list(columns)] if columns is not None else df
+
+
+def load_detections(path="game1_detections.csv", min_conf=DEFAULT_MIN_CONF, labels=DEFAULT_LABELS,
+                    court_size=DEFAULT_COURT_SIZE, columns=None, frames=None, cache_dir=CACHE_DIR):
+    """
+    Filtered detections with frame, conf, x1..y2, cx, cy, x_norm, y_norm.
+
+    `columns` / `frames` select a subset exactly like columnar_store.read_table.
+    Pass cache_dir=None to bypass the cache.
+    """
+    if cache_dir is None:
+        df = select_frames(build_detections(path, min_conf, labels, court_size), frames)
+        return df[columns] if columns is not None else df
+
+    cached = os.path.join(cache_dir, cache_key(path, min_conf, labels, court_size, cache_dir) + ".cols")
+    if not has_store(cached):
+        df = build_detections(path, min_conf, labels, court_size)
+        # Build under a private name, then rename, so parallel stages never see a partial cache
+        tmp = os.path.join(cache_dir, f"tmp-{os.getpid()}.cols")
+        write_table(df, tmp, export_csv=False)
+        try:
+            os.rename(tmp, cached)
+        except OSError:  # another process finished the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+        print(f"💾 Cached derived detections → {cached}")
+    return read_table(cached, columns=columns, frames=frames)
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,321 @@
+# detectors.py
+"""
+Pluggable YOLO inference backends behind one Detector interface.
+
+    detector = load_detector("yolov8n.pt", backend="openvino", precision="int8")
+    boxes = detector.predict(frames)   # one (N, 6) float32 array per frame
+
+Every backend returns the same normalized output, so the rest of the code
+doesn't care which one ran. Each row is [x1, y1, x2, y2, conf, cls] in
+original-frame pixels (the format stored by inference_cache.py). to_table()
+turns a run into a columnar DataFrame (frame, cls, label, conf, x1..y2).
+
+Backends:
+    ultralytics   the .pt checkpoint through ultralytics/torch (fp32)
+    onnx          ONNX Runtime on an exported .onnx (fp32, or int8 by dynamic quantization)
+    openvino      OpenVINO on an exported IR (fp32, fp16 weights, or int8 via NNCF calibration)
+
+Exports are made once with ultralytics and saved next to the .pt file
+(yolov8n.onnx, yolov8n_int8.onnx, yolov8n_fp16_openvino_model/, ...).
+ONNX Runtime and OpenVINO are optional; see benchmark_backends.py to compare
+latency, throughput and detection agreement on a clip.
+"""
+
+import abc
+import ast
+import os
+import shutil
+import cv2
+import numpy as np
+import pandas as pd
+
+try:
+    import onnxruntime
+except ImportError:  # only needed for backend="onnx"
+    onnxruntime = None
+
+try:
+    import openvino
+except ImportError:  # only needed for backend="openvino"
+    openvino = None
+
+BACKENDS = ("ultralytics", "onnx", "openvino")
+PRECISIONS = {"ultralytics": ("fp32",), "onnx": ("fp32", "int8"), "openvino": ("fp32", "fp16", "int8")}
+DEFAULT_IMGSZ = 640
+DEFAULT_CONF = 0.25    # ultralytics predict defaults, so every backend filters the same way
+DEFAULT_IOU = 0.7
+MAX_DET = 300
+_MAX_WH = 7680         # class offset for class-aware NMS in one pass
+_PAD_VALUE = 114
+_STRIDE = 32           # YOLOv8 max stride, when the export's metadata doesn't say
+
+
+# --- Normalized output ---
+def to_table(frame_ids, boxes, names=None):
+    """
+    Columnar detections from per-frame (N, 6) arrays: frame, cls, label, conf, x1, y1, x2, y2.
+    """
+    boxes = list(boxes)
+    counts = [len(b) for b in boxes]
+    data = np.concatenate(boxes) if boxes else np.zeros((0, 6), dtype=np.float32)
+    cls = data[:, 5].astype(np.int16)
+    table = pd.DataFrame({
+        "frame": np.repeat(np.asarray(frame_ids, dtype=np.int32), counts),
+        "cls": cls,
+        "conf": data[:, 4].astype(np.float32),
+        "x1": data[:, 0].astype(np.float32),
+        "y1": data[:, 1].astype(np.float32),
+        "x2": data[:, 2].astype(np.float32),
+        "y2": data[:, 3].astype(np.float32),
+    })
+    if names is not None:
+        table.insert(2, "label", pd.Categorical([names[c] for c in cls.tolist()]))
+    return table
+
+
+# --- Exports ---
+def backend_weights(weights, backend="ultralytics", precision="fp32", imgsz=DEFAULT_IMGSZ, calibration_data=None):
+    """
+    Path the backend loads for `weights`, exporting it on first use.
+
+    int8 OpenVINO calibrates with NNCF on `calibration_data` (an ultralytics
+    dataset yaml; ultralytics falls back to a small COCO sample).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (use one of {', '.join(BACKENDS)})")
+    if precision not in PRECISIONS[backend]:
+        raise ValueError(f"{backend} supports {', '.join(PRECISIONS[backend])}, not {precision}")
+    if backend == "ultralytics":
+        return weights
+
+    stem = os.path.splitext(weights)[0]
+    suffix = "" if precision == "fp32" else f"_{precision}"
+    target = f"{stem}{suffix}.onnx" if backend == "onnx" else f"{stem}{suffix}_openvino_model"
+    if os.path.exists(target):
+        return target
+
+    from ultralytics import YOLO
+    print(f"📦 Exporting {weights} → {target}")
+    if backend == "onnx":
+        exported = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=True)
+        if precision == "int8":
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(exported, target, weight_type=QuantType.QUInt8)
+            return target
+    else:
+        exported = YOLO(weights).export(format="openvino", imgsz=imgsz, dynamic=True,
+                                        half=precision == "fp16", int8=precision == "int8",
+                                        **({"data": calibration_data} if calibration_data else {}))
+    exported = str(exported).rstrip(os.sep)
+    if os.path.abspath(exported) != os.path.abspath(target):
+        shutil.move(exported, target)
+    return target
+
+
+# --- Detectors ---
+class Detector(abc.ABC):
+    """
+    Common interface: predict(images) → one (N, 6) float32 [x1, y1, x2, y2, conf, cls]
+    array per image, in original image pixels.
+
+    - names: {class id: label}
+    - ckpt_path: weights file actually loaded (fingerprinted by the inference cache)
+    - threads: cap on intra-op threads (None = backend default)
+    """
+
+    backend = None
+
+    def __init__(self, weights, imgsz=DEFAULT_IMGSZ, conf=DEFAULT_CONF, iou=DEFAULT_IOU, threads=None):
+        self.weights = weights
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.threads = threads
+        self.precision = "fp32"
+        self.names = {}
+        self.ckpt_path = weights
+
+    @abc.abstractmethod
+    def predict(self, images, conf=None, iou=None, verbose=False):
+        """conf / iou override the detector's thresholds for this call (None keeps them)."""
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.ckpt_path} imgsz={self.imgsz}>"
+
+
+class UltralyticsDetector(Detector):
+    backend = "ultralytics"
+
+    def __init__(self, weights, imgsz=DEFAULT_IMGSZ, conf=DEFAULT_CONF, iou=DEFAULT_IOU, threads=None):
+        super().__init__(weights, imgsz, conf, iou, threads)
+        from ultralytics import YOLO
+        if threads is not None:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = YOLO(weights)
+        self.names = dict(self.model.names)
+        self.ckpt_path = getattr(self.model, "ckpt_path", None) or weights
+
+    def predict(self, images, conf=None, iou=None, verbose=False):
+        results = self.model.predict(list(images), imgsz=self.imgsz, conf=self.conf if conf is None else conf,
+                                     iou=self.iou if iou is None else iou, max_det=MAX_DET, verbose=verbose)
+        return [r.boxes.data[:, :6].cpu().numpy().astype(np.float32, copy=False) for r in results]
+
+
+# --- Pre/post-processing for exported models (mirrors ultralytics predict) ---
+def letterbox(image, size, stride=None):
+    """
+    Resize keeping aspect ratio and pad like ultralytics' LetterBox; returns
+    (image, scale, (pad_x, pad_y)).
+
+    Pads to size × size, or with `stride` only up to the next multiple of
+    stride (the minimal rect padding ultralytics predict uses on dynamic models).
+    """
+    h, w = image.shape[:2]
+    scale = min(size / h, size / w)
+    nw, nh = int(round(w * scale)), int(round(h * scale))
+    pad_w, pad_h = size - nw, size - nh
+    if stride:
+        pad_w, pad_h = pad_w % stride, pad_h % stride
+    left, top = int(round(pad_w / 2 - 0.1)), int(round(pad_h / 2 - 0.1))
+    out = np.full((nh + pad_h, nw + pad_w, 3), _PAD_VALUE, dtype=np.uint8)
+    out[top:top + nh, left:left + nw] = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return out, scale, (left, top)
+
+
+def to_blob(images):
+    """BGR uint8 HWC images → RGB float32 NCHW in [0, 1]."""
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+def nms(boxes, scores, iou_threshold):
+    """Indices kept by greedy non-maximum suppression, highest score first."""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        iw = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        ih = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = iw * ih
+        order = rest[inter / (areas[i] + areas[rest] - inter + 1e-9) <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def decode_predictions(pred, conf, iou, scale, pad, shape):
+    """
+    One image's raw YOLOv8 head output (4 + n_classes, anchors) → (N, 6) boxes
+    in original pixels: confidence filter, class-aware NMS, undo the letterbox.
+    """
+    pred = pred.T
+    scores = pred[:, 4:]
+    cls = scores.argmax(axis=1)
+    score = scores[np.arange(len(scores)), cls]
+    keep = score > conf
+    pred, cls, score = pred[keep], cls[keep], score[keep]
+    if not len(pred):
+        return np.zeros((0, 6), dtype=np.float32)
+
+    cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    kept = nms(xyxy + cls[:, None] * _MAX_WH, score, iou)[:MAX_DET]
+    xyxy, cls, score = xyxy[kept], cls[kept], score[kept]
+
+    xyxy = (xyxy - [pad[0], pad[1], pad[0], pad[1]]) / scale
+    xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, shape[1])
+    xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, shape[0])
+    return np.column_stack([xyxy, score, cls]).astype(np.float32)
+
+
+class ExportedDetector(Detector):
+    """Shared letterbox → run → decode path; subclasses implement _run(blob)."""
+
+    batch_limit = None     # fixed batch size of the exported graph, if any
+    dynamic_shape = False  # graph accepts any input height/width (rect letterboxing)
+    stride = _STRIDE
+
+    @abc.abstractmethod
+    def _run(self, blob):
+        """Raw head output, one (4 + n_classes, anchors) array per image in the blob."""
+
+    def predict(self, images, conf=None, iou=None, verbose=False):
+        images = list(images)
+        # Like ultralytics: minimal rect padding when the graph allows it and the batch shares one shape
+        rect = self.dynamic_shape and len({image.shape[:2] for image in images}) == 1
+        prepared = [letterbox(image, self.imgsz, self.stride if rect else None) for image in images]
+        step = self.batch_limit or max(len(images), 1)
+        outputs = []
+        for start in range(0, len(images), step):
+            outputs.extend(self._run(to_blob([p[0] for p in prepared[start:start + step]])))
+        return [
+            decode_predictions(out, self.conf if conf is None else conf, self.iou if iou is None else iou,
+                               scale, pad, image.shape[:2])
+            for out, image, (_, scale, pad) in zip(outputs, images, prepared)
+        ]
+
+
+class OnnxDetector(ExportedDetector):
+    backend = "onnx"
+
+    def __init__(self, weights, imgsz=DEFAULT_IMGSZ, conf=DEFAULT_CONF, iou=DEFAULT_IOU, threads=None):
+        super().__init__(weights, imgsz, conf, iou, threads)
+        if onnxruntime is None:
+            raise ImportError("backend='onnx' needs onnxruntime (pip install onnxruntime)")
+        options = onnxruntime.SessionOptions()
+        if threads is not None:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(weights, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        batch, _, height, width = self.session.get_inputs()[0].shape
+        self.batch_limit = batch if isinstance(batch, int) else None
+        self.dynamic_shape = not (isinstance(height, int) and isinstance(width, int))
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else {}
+        self.stride = int(meta.get("stride", _STRIDE))
+
+    def _run(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVINODetector(ExportedDetector):
+    backend = "openvino"
+
+    def __init__(self, weights, imgsz=DEFAULT_IMGSZ, conf=DEFAULT_CONF, iou=DEFAULT_IOU, threads=None):
+        super().__init__(weights, imgsz, conf, iou, threads)
+        if openvino is None:
+            raise ImportError("backend='openvino' needs OpenVINO (pip install openvino)")
+        xml = next(os.path.join(weights, f) for f in sorted(os.listdir(weights)) if f.endswith(".xml"))
+        core = openvino.Core()
+        config = {"INFERENCE_NUM_THREADS": threads} if threads is not None else {}
+        model = core.read_model(xml)
+        shape = model.inputs[0].get_partial_shape()
+        self.batch_limit = shape[0].get_length() if shape[0].is_static else None
+        self.dynamic_shape = shape[2].is_dynamic or shape[3].is_dynamic
+        self.compiled = core.compile_model(model, "CPU", config)
+        self.ckpt_path = os.path.splitext(xml)[0] + ".bin"
+        metadata = os.path.join(weights, "metadata.yaml")
+        if os.path.exists(metadata):
+            import yaml
+            with open(metadata) as f:
+                meta = yaml.safe_load(f)
+            self.names = meta.get("names", {})
+            self.stride = int(meta.get("stride", _STRIDE))
+
+    def _run(self, blob):
+        return self.compiled(blob)[self.compiled.output(0)]
+
+
+_CLASSES = {"ultralytics": UltralyticsDetector, "onnx": OnnxDetector, "openvino": OpenVINODetector}
+
+
+def load_detector(weights, backend="ultralytics", precision="fp32", imgsz=DEFAULT_IMGSZ,
+                  conf=DEFAULT_CONF, iou=DEFAULT_IOU, threads=None, calibration_data=None):
+    """Detector for a .pt checkpoint on the chosen backend (exported on first use)."""
+    path = backend_weights(weights, backend, precision, imgsz, calibration_data)
+    detector = _CLASSES[backend](path, imgsz=imgsz, conf=conf, iou=iou, threads=threads)
+    detector.precision = precision
+    return detector
@@ -0,0 +1,206 @@
+# frame_pipeline.py
+"""
+Threaded decode → inference → write pipeline for video detection runs.
+
+Each stage runs in its own thread and hands work to the next one through a
+bounded queue, so a slow stage applies backpressure instead of letting frames
+pile up in memory. OpenCV decode and torch inference both release the GIL,
+so a run goes at the speed of the slowest stage rather than the sum of all three.
+"""
+
+import queue
+import threading
+import time
+
+_DONE = object()  # end-of-stream marker passed down the queues
+_POLL_SECONDS = 0.1
+
+
+class StageStats:
+    """Counters for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0     # seconds spent doing the stage's own work
+        self.starved = 0.0  # seconds waiting on the upstream stage
+        self.blocked = 0.0  # seconds waiting for room in the downstream queue
+
+    @property
+    def rate(self):
+        return self.items / self.busy if self.busy > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "items": self.items,
+            "busy_s": round(self.busy, 4),
+            "starved_s": round(self.starved, 4),
+            "blocked_s": round(self.blocked, 4),
+            "items_per_s": round(self.rate, 2),
+        }
+
+
+class FramePipeline:
+    """
+    Run `source` → `infer` → `sink` as three overlapping stages.
+
+    - `source`: iterable of (frame_idx, frame), consumed in the decode thread
+    - `infer`: callable(frame) -> result, run in the inference thread
+    - `sink`: callable(frame_idx, result), run in the calling thread
+    - `profiler`: optional run_profiler.RunProfiler; worker threads run under its thread_profile()
+    """
+
+    STAGES = ("decode", "inference", "write")
+
+    def __init__(self, source, infer, sink, queue_size=32, profiler=None):
+        self.source = source
+        self.infer = infer
+        self.sink = sink
+        self.profiler = profiler
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.outputs = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+        self.errors = []
+        self.stats = {name: StageStats(name) for name in self.STAGES}
+        self.wall_time = 0.0
+
+    # --- Queue helpers (wake up periodically so shutdown is never stuck) ---
+    def _put(self, q, item):
+        while not self.stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while True:
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if self.stop.is_set():
+                    return _DONE
+
+    def _fail(self, exc):
+        self.errors.append(exc)
+        self.stop.set()
+
+    # --- Stages ---
+    def _decode(self):
+        stats = self.stats["decode"]
+        frames = iter(self.source)
+        try:
+            while not self.stop.is_set():
+                t0 = time.perf_counter()
+                try:
+                    item = next(frames)
+                except StopIteration:
+                    break
+                t1 = time.perf_counter()
+                stats.busy += t1 - t0
+                stats.items += 1
+                if not self._put(self.frames, item):
+                    break
+                stats.blocked += time.perf_counter() - t1
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            close = getattr(frames, "close", None)
+            if close is not None:
+                close()
+            self._put(self.frames, _DONE)
+
+    def _inference(self):
+        stats = self.stats["inference"]
+        try:
+            while True:
+                t0 = time.perf_counter()
+                item = self._get(self.frames)
+                t1 = time.perf_counter()
+                stats.starved += t1 - t0
+                if item is _DONE:
+                    break
+                frame_idx, frame = item
+                result = self.infer(frame)
+                t2 = time.perf_counter()
+                stats.busy += t2 - t1
+                stats.items += 1
+                if not self._put(self.outputs, (frame_idx, result)):
+                    break
+                stats.blocked += time.perf_counter() - t2
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            self._put(self.outputs, _DONE)
+
+    def _write(self):
+        stats = self.stats["write"]
+        while True:
+            t0 = time.perf_counter()
+            item = self._get(self.outputs)
+            t1 = time.perf_counter()
+            stats.starved += t1 - t0
+            if item is _DONE:
+                break
+            self.sink(*item)
+            stats.busy += time.perf_counter() - t1
+            stats.items += 1
+
+    def _traced(self, stage):
+        if self.profiler is None:
+            return stage
+
+        def run():
+            with self.profiler.thread_profile():
+                stage()
+        return run
+
+    def run(self):
+        """Run all stages to completion; re-raises the first stage error."""
+        start = time.perf_counter()
+        workers = [
+            threading.Thread(target=self._traced(self._decode), name="decode", daemon=True),
+            threading.Thread(target=self._traced(self._inference), name="inference", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
+
+        try:
+            self._write()
+        except BaseException as exc:  # includes KeyboardInterrupt
+            self._fail(exc)
+        finally:
+            self.stop.set()
+            for worker in workers:
+                worker.join()
+            self.wall_time = time.perf_counter() - start
+
+        if self.errors:
+            raise self.errors[0]
+        return self
+
+    # --- Reporting ---
+    def summary(self):
+        frames = self.stats["write"].items
+        return {
+            "frames": frames,
+            "wall_s": round(self.wall_time, 4),
+            "fps": round(frames / self.wall_time, 2) if self.wall_time > 0 else 0.0,
+            "bottleneck": self.bottleneck(),
+            "stages": {name: s.as_dict() for name, s in self.stats.items()},
+        }
+
+    def bottleneck(self):
+        return max(self.stats.values(), key=lambda s: s.busy).name
+
+    def report(self):
+        s = self.summary()
+        print(f"📊 Pipeline throughput: {s['frames']} frames in {s['wall_s']:.1f}s ({s['fps']:.1f} fps)")
+        print(f"   {'stage':<10} {'items':>8} {'busy s':>9} {'items/s':>9} {'starved s':>10} {'blocked s':>10}")
+        for stage in self.stats.values():
+            print(
+                f"   {stage.name:<10} {stage.items:>8} {stage.busy:>9.2f} {stage.rate:>9.1f}"
+                f" {stage.starved:>10.2f} {stage.blocked:>10.2f}"
+            )
+        print(f"   🐢 Bottleneck stage: {s['bottleneck']}")
@@ -1,73 +1,50 @@
-import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
-from scipy.stats import gaussian_kde
-from court_utils import draw_halfcourt
+from detection_loader import load_detections
+from density import binned_kde
+from report_renderer import heatmap_figure, zone_figure, save_figure
+from zones import fit_zones, zone_counts, save_zones, load_zones, has_zones, assign_zones
 
 # --- SETTINGS ---
 COURT_WIDTH = 1920
 COURT_HEIGHT = 1080
 OUTPUT_RES_X = 50  # match NBA halfcourt width
 OUTPUT_RES_Y = 47  # match NBA halfcourt height
+DETECTIONS = 'game1_detections.csv'
+REFIT_ZONES = False  # True: refit zones even if a fitted version is registered
 
-# Load detections
-df = pd.read_csv('game1_detections.csv')
-
-# Filter confident person detections
-df = df[(df['label'] == 'person') & (df['conf'] > 0.6)]
-
-# Compute centroids
-df['cx'] = (df['x1'] + df['x2']) / 2
-df['cy'] = (df['y1'] + df['y2']) / 2
-
-# Normalize to NBA court scale (50x47)
-df['x_norm'] = df['cx'] / COURT_WIDTH * 50
-df['y_norm'] = (1 - df['cy'] / COURT_HEIGHT) * 47  # invert y
+# Load confident person detections, normalized to NBA court scale (50x47)
+df = load_detections(DETECTIONS, min_conf=0.6, court_size=(COURT_WIDTH, COURT_HEIGHT),
+                     columns=['frame', 'x_norm', 'y_norm'])
 
 coords = df[['x_norm', 'y_norm']].values
 
 # --- Heatmap Kernel Density Estimation ---
 print("📡 Performing KDE Heatmap Estimation...")
-kde = gaussian_kde(coords.T, bw_method=0.3)
 
-# Create grid
+# Create grid; binned FFT KDE, same bandwidth as gaussian_kde(bw_method=0.3)
 xgrid = np.linspace(0, 50, 500)
 ygrid = np.linspace(0, 47, 470)
-X, Y = np.meshgrid(xgrid, ygrid)
-positions = np.vstack([X.ravel(), Y.ravel()])
-Z = np.reshape(kde(positions).T, X.shape)
+Z = binned_kde(coords[:, 0], coords[:, 1], xgrid, ygrid, bw_method=0.3)
 
 # --- Plot Global Heatmap ---
-fig, ax = plt.subplots(figsize=(8, 7))
-draw_halfcourt(ax, title="🔥 Player Movement Heatmap — Game 1")
-cmap = sns.color_palette("rocket", as_cmap=True)
-heat = ax.contourf(X, Y, Z, levels=50, cmap=cmap)
-plt.colorbar(heat, ax=ax, label="Movement Density")
-plt.tight_layout()
-plt.savefig("movement_heatmap.png")
-plt.show()
-
-# --- Zone Clustering (K-Means) ---
-print("🧪 Running K-Means Clustering on Position Data...")
-k = 6  # number of movement zones
-kmeans = KMeans(n_clusters=k, n_init=10)
-df['zone'] = kmeans.fit_predict(coords)
+save_figure(heatmap_figure(xgrid, ygrid, Z, title="🔥 Player Movement Heatmap — Game 1"), "movement_heatmap.png")
+
+# --- Zone Clustering (seeded, chunked mini-batch K-Means) ---
+if REFIT_ZONES or not has_zones():
+    print("🧪 Fitting movement zones chunk by chunk...")
+    load_kwargs = dict(min_conf=0.6, court_size=(COURT_WIDTH, COURT_HEIGHT))
+    model = fit_zones([DETECTIONS], **load_kwargs)
+    zones = save_zones(model, [DETECTIONS], zone_counts([DETECTIONS], model, **load_kwargs))
+    print(f"💾 Registered {zones.name} v{zones.version}")
+else:
+    zones = load_zones()
+df['zone'] = assign_zones(df, zones)
+print(f"📂 Zones from {zones.name} v{zones.version} (model load {zones.load_seconds * 1000:.1f} ms)")
+k = zones.meta['k']  # number of movement zones
 
 # --- Plot Clusters Over Court ---
-fig, ax = plt.subplots(figsize=(8, 7))
-draw_halfcourt(ax, title="🧬 Movement Zone Clusters — Game 1")
-palette = sns.color_palette("Set2", k)
-
-for i in range(k):
-    cluster_points = df[df['zone'] == i]
-    ax.scatter(cluster_points['x_norm'], cluster_points['y_norm'], s=8, color=palette[i], label=f"Zone {i+1}", alpha=0.5)
-
-ax.legend(loc='upper right')
-plt.tight_layout()
-plt.savefig("movement_clusters.png")
-plt.show()
+save_figure(zone_figure(df['x_norm'], df['y_norm'], df['zone'], k, title="🧬 Movement Zone Clusters — Game 1"),
+            "movement_clusters.png")
 
 # --- Zone Density Table ---
 zone_stats = df.groupby('zone')[['x_norm', 'y_norm']].agg(['mean', 'std', 'count'])
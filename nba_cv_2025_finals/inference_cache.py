@@ -0,0 +1,345 @@
+# inference_cache.py
+"""
+Content-addressed cache of raw detector output.
+
+Every detection script runs the same model over the same video frames, and a
+rerun (new tracker settings, a resumed job, a fixed bug in the write stage)
+repeats all of that inference. Here each frame's boxes are stored as an
+(N, 6) float32 array of [x1, y1, x2, y2, conf, cls] under
+
+    .cache/inference/<key>/meta.json         what the key was built from
+    .cache/inference/<key>/b<first frame>-<pid>.npz
+                                             BLOCK_FRAMES frames per file
+
+where <key> hashes the video content, the model weights, the input frame
+size, the model image size and the confidence threshold, so a cached entry
+can never be served for a different video or model. Cached frames are not
+even decoded (see video_io.sample_frames(skip_decode=...)), which makes a
+rerun on a processed game I/O-bound instead of inference-bound.
+
+The cache is capped at MAX_CACHE_BYTES; blocks are evicted least recently
+used first (reads refresh a block's mtime).
+
+Usage:
+    python inference_cache.py             # list cache entries
+    python inference_cache.py --clear     # delete the whole cache
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+from batched_inference import predict_batched, DEFAULT_BATCH_SIZE
+
+CACHE_DIR = os.path.join(".cache", "inference")
+MAX_CACHE_BYTES = 2 << 30   # 2 GB across all videos and models
+BLOCK_FRAMES = 900          # frames per block file
+DEFAULT_IMGSZ = 640         # ultralytics default model input size
+_CACHE_VERSION = 1          # bump when the stored layout changes
+_HASH_INDEX = "file_hashes.json"
+_META = "meta.json"
+
+
+# --- Fingerprinting ---
+def file_hash(path, cache_dir=CACHE_DIR):
+    """
+    SHA-1 of a file's content, memoized against size + mtime so a multi-GB
+    video is only read once.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    signature = [st.st_size, st.st_mtime_ns]
+    index_path = os.path.join(cache_dir, _HASH_INDEX)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    entry = index.get(path)
+    if entry and entry["signature"] == signature:
+        return entry["sha1"]
+
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+
+    index[path] = {"signature": signature, "sha1": digest.hexdigest()}
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, index_path)
+    return index[path]["sha1"]
+
+
+def weights_file(model):
+    """Checkpoint file behind a loaded ultralytics model (or a path to one)."""
+    path = model if isinstance(model, (str, os.PathLike)) else getattr(model, "ckpt_path", None)
+    if not path or not os.path.isfile(path):
+        raise FileNotFoundError(f"Can't find the weights file for {model!r} to fingerprint")
+    return path
+
+
+def boxes_array(result):
+    """
+    (N, 6) float32 [x1, y1, x2, y2, conf, cls] from one ultralytics Results
+    (Detector backends already return this).
+    """
+    if isinstance(result, np.ndarray):
+        return result.astype(np.float32, copy=False).reshape(-1, 6)
+    return result.boxes.data[:, :6].cpu().numpy().astype(np.float32, copy=False)
+
+
+# --- Eviction ---
+def _block_files(cache_dir):
+    if not os.path.isdir(cache_dir):
+        return []
+    return [
+        os.path.join(cache_dir, key, f)
+        for key in os.listdir(cache_dir) if os.path.isdir(os.path.join(cache_dir, key))
+        for f in os.listdir(os.path.join(cache_dir, key)) if f.endswith(".npz")
+    ]
+
+
+def cache_size(cache_dir=CACHE_DIR):
+    return sum(os.path.getsize(f) for f in _block_files(cache_dir))
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Delete least recently used blocks until the cache fits in max_bytes; returns the deleted paths."""
+    blocks = []
+    for f in _block_files(cache_dir):
+        try:
+            st = os.stat(f)
+        except FileNotFoundError:  # evicted by another process
+            continue
+        blocks.append((st.st_mtime_ns, st.st_size, f))
+    total = sum(size for _, size, _ in blocks)
+    deleted = []
+    for _, size, f in sorted(blocks):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(f)
+        except FileNotFoundError:
+            pass
+        total -= size
+        deleted.append(f)
+    return deleted
+
+
+# --- Cache ---
+class InferenceCache:
+    """
+    Detector output for one (video, weights, input size, imgsz, conf) combination.
+
+    `model` is a loaded ultralytics model or a detectors.Detector; imgsz
+    defaults to the detector's own.
+
+    - has(frame_id): True if the frame's boxes are cached (cheap; safe to call from another thread)
+    - get(frame_id): (N, 6) array or None
+    - put(frame_id, boxes): buffer a frame's boxes; written every BLOCK_FRAMES frames
+    - close(): write the last partial block and print hit/miss counts
+    """
+
+    def __init__(self, video_path, model, input_size, imgsz=None, conf=None,
+                 cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, block_frames=BLOCK_FRAMES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.block_frames = block_frames
+        self.params = {
+            "version": _CACHE_VERSION,
+            "video": file_hash(video_path, cache_dir),
+            "weights": file_hash(weights_file(model), cache_dir),
+            "input_size": list(input_size),
+            "imgsz": imgsz or getattr(model, "imgsz", DEFAULT_IMGSZ),
+            "conf": conf,
+        }
+        self.key = hashlib.sha1(json.dumps(self.params, sort_keys=True).encode()).hexdigest()[:16]
+        self.root = os.path.join(cache_dir, self.key)
+        os.makedirs(self.root, exist_ok=True)
+        meta_path = os.path.join(self.root, _META)
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w") as f:
+                json.dump({**self.params, "video_path": os.path.abspath(video_path),
+                           "weights_path": os.path.abspath(weights_file(model))}, f, indent=1)
+
+        self.hits = 0
+        self.misses = 0
+        self._frames = {}      # frame_id → block file holding it
+        self._pending = {}     # frame_id → boxes not yet written
+        self._block = None     # (path, {frame_id: boxes}) last block read
+        for name in os.listdir(self.root):
+            if name.endswith(".npz"):
+                path = os.path.join(self.root, name)
+                with np.load(path) as block:
+                    for frame_id in block["frames"].tolist():
+                        self._frames[frame_id] = path
+
+    def __len__(self):
+        return len(self._frames) + len(self._pending)
+
+    def has(self, frame_id):
+        return frame_id in self._pending or frame_id in self._frames
+
+    # --- Reading ---
+    def _load_block(self, path):
+        with np.load(path) as block:
+            frames, counts, boxes = block["frames"], block["counts"], block["boxes"]
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        os.utime(path)  # mark as recently used for eviction
+        return {int(f): boxes[offsets[i]:offsets[i + 1]] for i, f in enumerate(frames)}
+
+    def get(self, frame_id):
+        """Cached boxes for `frame_id`, or None (counted as a miss)."""
+        if frame_id in self._pending:
+            self.hits += 1
+            return self._pending[frame_id]
+        path = self._frames.get(frame_id)
+        if path is not None:
+            if self._block is None or self._block[0] != path:
+                try:
+                    self._block = (path, self._load_block(path))
+                except FileNotFoundError:  # evicted by another process
+                    self._forget(path)
+                    path = None
+            if path is not None:
+                self.hits += 1
+                return self._block[1][frame_id]
+        self.misses += 1
+        return None
+
+    # --- Writing ---
+    def put(self, frame_id, boxes):
+        self._pending[int(frame_id)] = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+        if len(self._pending) >= self.block_frames:
+            self.flush()
+
+    def flush(self):
+        """Write buffered frames as one block file, then evict down to max_bytes."""
+        if not self._pending:
+            return
+        frames = sorted(self._pending)
+        path = os.path.join(self.root, f"b{frames[0]:08d}-{os.getpid()}.npz")
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(
+                fh,
+                frames=np.array(frames, dtype=np.int64),
+                counts=np.array([len(self._pending[f]) for f in frames], dtype=np.int32),
+                boxes=np.concatenate([self._pending[f] for f in frames]),
+            )
+        os.replace(tmp, path)  # atomic: readers never see half a block
+        for f in frames:
+            self._frames[f] = path
+        self._pending = {}
+        for deleted in evict(self.cache_dir, self.max_bytes):
+            if os.path.dirname(deleted) == self.root:
+                self._forget(deleted)
+
+    def _forget(self, path):
+        self._frames = {f: p for f, p in self._frames.items() if p != path}
+        if self._block is not None and self._block[0] == path:
+            self._block = None
+
+    def close(self, report=True):
+        self.flush()
+        total = self.hits + self.misses
+        if report and total:
+            print(f"⚡ Inference cache: {self.hits:,}/{total:,} frames served from {self.root} "
+                  f"({self.hits / total:.0%} hit rate)")
+
+
+# --- Cached inference ---
+def cached_detections(model, frames, cache, batch_size=DEFAULT_BATCH_SIZE, reread=None, **predict_kwargs):
+    """
+    Batched inference through the cache.
+
+    Consumes (frame_id, image) pairs, where `image` may be None for frames
+    the cache already holds, and yields (frame_id, boxes) in input order with
+    boxes an (N, 6) [x1, y1, x2, y2, conf, cls] array. Cache misses are
+    batched through the model (see predict_batched) and stored. With
+    cache=None every frame goes straight to the model.
+
+    A frame skipped at decode time can still miss if its block was evicted
+    in between (by this run's own flushes or another process). `reread`
+    (frame_id → image, e.g. a video_io.FrameReader) decodes it then;
+    without one the run stops with a KeyError.
+    """
+    if cache is None:
+        for frame_id, result in predict_batched(model, frames, batch_size, **predict_kwargs):
+            yield frame_id, boxes_array(result)
+        return
+
+    pending = []   # (frame_id, boxes or None) in input order
+    misses = []    # (frame_id, image) still to run
+
+    def resolve():
+        fresh = {}
+        for frame_id, result in predict_batched(model, misses, max(len(misses), 1), **predict_kwargs):
+            fresh[frame_id] = boxes_array(result)
+            cache.put(frame_id, fresh[frame_id])
+        for frame_id, boxes in pending:
+            yield frame_id, boxes if boxes is not None else fresh[frame_id]
+        pending.clear()
+        misses.clear()
+
+    for frame_id, image in frames:
+        boxes = cache.get(frame_id)
+        if boxes is None:
+            if image is None:
+                if reread is None:
+                    raise KeyError(f"Frame {frame_id} was not decoded but is no longer cached — rerun to fill it")
+                image = reread(frame_id)
+            misses.append((frame_id, image))
+        pending.append((frame_id, boxes))
+        if not misses or len(misses) == batch_size:
+            yield from resolve()
+    yield from resolve()
+
+
+def cached_detect(model, cache, frame_id, image, reread=None, **predict_kwargs):
+    """Single-frame version of cached_detections: (N, 6) boxes for one frame."""
+    return next(iter(cached_detections(model, [(frame_id, image)], cache, 1, reread, **predict_kwargs)))[1]
+
+
+# --- CLI ---
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the inference cache")
+    parser.add_argument("--dir", default=CACHE_DIR, help="cache directory")
+    parser.add_argument("--clear", action="store_true", help="delete every cached entry")
+    args = parser.parse_args()
+
+    if args.clear:
+        shutil.rmtree(args.dir, ignore_errors=True)
+        print(f"🧹 Cleared {args.dir}/")
+        return
+    entries = sorted(
+        d for d in (os.listdir(args.dir) if os.path.isdir(args.dir) else [])
+        if os.path.exists(os.path.join(args.dir, d, _META))
+    )
+    if not entries:
+        print(f"📭 No cached inference in {args.dir}/")
+        return
+    print(f"📦 Inference cache in {args.dir}/ ({cache_size(args.dir) / 1e6:.1f} MB of {MAX_CACHE_BYTES / 1e6:.0f} MB)")
+    for key in entries:
+        root = os.path.join(args.dir, key)
+        with open(os.path.join(root, _META)) as f:
+            meta = json.load(f)
+        blocks = [os.path.join(root, f) for f in os.listdir(root) if f.endswith(".npz")]
+        frames = 0
+        for path in blocks:
+            with np.load(path) as block:
+                frames += len(block["frames"])
+        size = sum(os.path.getsize(p) for p in blocks)
+        used = time.strftime("%Y-%m-%d %H:%M", time.localtime(max(map(os.path.getmtime, blocks)))) if blocks else "-"
+        print(f"   {key}  {os.path.basename(meta['video_path']):<24} {os.path.basename(meta['weights_path']):<14} "
+              f"{meta['input_size'][0]}x{meta['input_size'][1]} conf={meta['conf']}  "
+              f"{frames:>8,} frames  {size / 1e6:>7.1f} MB  last used {used}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# kinematics.py
+"""
+Vectorized per-player velocity and acceleration.
+
+All rows are sorted once by (player, frame); every quantity is then a diff
+against the previous row, masked where a new player's track starts. No Python
+loop runs per row or per player, so tens of millions of detections take
+seconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def sort_by_track(ids, frames):
+    """
+    Return (order, new_track) for rows sorted by (id, frame).
+
+    `order` is a stable sort permutation (ties keep their input order) and
+    `new_track[i]` is True where sorted row i is the first row of its id.
+    """
+    ids = np.asarray(ids)
+    frames = np.asarray(frames)
+    if len(frames) > 1 and np.all(frames[1:] >= frames[:-1]):
+        # Detections usually arrive in frame order: one stable (radix) sort on ids suffices
+        order = np.argsort(ids, kind="stable")
+    else:
+        by_frame = np.argsort(frames, kind="stable")
+        order = by_frame[np.argsort(ids[by_frame], kind="stable")]
+    sorted_ids = ids[order]
+    new_track = np.ones(len(order), dtype=bool)
+    new_track[1:] = sorted_ids[1:] != sorted_ids[:-1]
+    return order, new_track
+
+
+def track_position(new_track):
+    """Index of each row within its own track (0 for the first row)."""
+    idx = np.arange(len(new_track))
+    return idx - np.maximum.accumulate(np.where(new_track, idx, 0))
+
+
+def step_velocities(frames, xs, ys, new_track):
+    """
+    Per-row displacement rate from the previous row of the same track.
+
+    Inputs must already be sorted by track. Returns (dt, vx, vy, speed) as
+    float64 arrays; values on track-start rows are meaningless and should be
+    masked by the caller. dt == 0 yields inf/nan, as plain division would.
+    """
+    frames = np.asarray(frames, dtype=np.float64)
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+
+    dt = np.diff(frames, prepend=frames[:1])
+    dx = np.diff(xs, prepend=xs[:1])
+    dy = np.diff(ys, prepend=ys[:1])
+    dt[new_track] = dx[new_track] = dy[new_track] = 0.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vx = dx / dt
+        vy = dy / dt
+        speed = np.sqrt(dx**2 + dy**2) / dt
+    return dt, vx, vy, speed
+
+
+def movement_features(df, id_col="player_id", frame_col="frame", x_col="cx", y_col="cy"):
+    """
+    Frame-to-frame movement features for every player.
+
+    Produces one row per detection that has an earlier detection of the same
+    player in a different frame, with columns
+    frame, player_id, cx, cy, vx, vy, speed, acceleration:
+
+    - vx, vy, speed: displacement since the previous detection / frame gap
+    - acceleration: (speed - previous step's speed) / frame gap, 0 for the
+      second detection of a track
+
+    Rows come out sorted by (player_id, frame).
+    """
+    order, new_track = sort_by_track(df[id_col].to_numpy(), df[frame_col].to_numpy())
+    frames = df[frame_col].to_numpy()[order]
+    xs = df[x_col].to_numpy()[order]
+    ys = df[y_col].to_numpy()[order]
+
+    dt, vx, vy, speed = step_velocities(frames, xs, ys, new_track)
+    pos = track_position(new_track)
+
+    prev_speed = np.empty_like(speed)
+    prev_speed[0] = 0.0
+    prev_speed[1:] = speed[:-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acceleration = np.where(pos >= 2, (speed - prev_speed) / dt, 0.0)
+
+    keep = (pos >= 1) & (dt != 0)
+    return pd.DataFrame({
+        "frame": frames[keep],
+        "player_id": df[id_col].to_numpy()[order][keep],
+        "cx": xs[keep],
+        "cy": ys[keep],
+        "vx": vx[keep],
+        "vy": vy[keep],
+        "speed": speed[keep],
+        "acceleration": acceleration[keep],
+    })
+
+
+def track_speed_acceleration(ids, frames, xs, ys, initial_speed=None):
+    """
+    Speed and acceleration for every point, aligned with the input order.
+
+    Each track starts at speed 0 / acceleration 0; afterwards
+    speed = distance / dt and acceleration = (speed - previous speed) / dt,
+    both 0 when dt == 0 (duplicate frame). Points of a track must be given in
+    frame order, which is the case for anything appended frame by frame.
+    `initial_speed` (per point) overrides the speed of track-start points, so
+    a track can be continued from a carried-over last point.
+    """
+    order, new_track = sort_by_track(ids, frames)
+    frames = np.asarray(frames, dtype=np.float64)[order]
+    xs = np.asarray(xs, dtype=np.float64)[order]
+    ys = np.asarray(ys, dtype=np.float64)[order]
+    dt = np.diff(frames, prepend=frames[:1])
+    dist = np.hypot(np.diff(xs, prepend=xs[:1]), np.diff(ys, prepend=ys[:1]))
+
+    moving = (dt > 0) & ~new_track
+    safe_dt = np.where(moving, dt, 1.0)
+    speed = np.where(moving, dist / safe_dt, 0.0)
+    if initial_speed is not None:
+        speed[new_track] = np.asarray(initial_speed, dtype=np.float64)[order][new_track]
+    prev_speed = np.concatenate([[0.0], speed[:-1]])
+    prev_speed[new_track] = 0.0
+    acceleration = np.where(moving, (speed - prev_speed) / safe_dt, 0.0)
+
+    out_speed = np.empty_like(speed)
+    out_accel = np.empty_like(acceleration)
+    out_speed[order] = speed
+    out_accel[order] = acceleration
+    return out_speed, out_accel
@@ -0,0 +1,181 @@
+# model_registry.py
+"""
+Versioned store for fitted models.
+
+Each fit is saved as models/<name>/v<NNN>/ with:
+
+    model.joblib    the estimator and its scaler, pickled together
+    meta.json       feature schema, estimator type, training size, metrics
+
+Loading reads only meta.json; the pickle is loaded on first use, so a script
+that only needs the schema (or never predicts) pays nothing. Scoring a new
+game with a registered model is then a scaler transform plus predict.
+
+Usage:
+    python model_registry.py            # list models and time a cold load of each
+"""
+
+import json
+import os
+import shutil
+import sys
+import time
+import joblib
+import numpy as np
+import sklearn
+
+REGISTRY_DIR = "models"
+_BUNDLE = "model.joblib"
+_META = "meta.json"
+_LOADED = {}  # (registry, name, version) → ModelBundle, shared within a process
+
+
+class ModelBundle:
+    """A registered model: feature schema plus a lazily loaded estimator and scaler."""
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.meta = meta
+        self.name = meta["name"]
+        self.version = meta["version"]
+        self.features = list(meta["features"])
+        self.load_seconds = None
+        self._estimator = None
+        self._scaler = None
+
+    def _load(self):
+        if self.load_seconds is None:
+            start = time.perf_counter()
+            bundle = joblib.load(os.path.join(self.path, _BUNDLE))
+            self._estimator, self._scaler = bundle["estimator"], bundle["scaler"]
+            self.load_seconds = time.perf_counter() - start
+
+    @property
+    def estimator(self):
+        self._load()
+        return self._estimator
+
+    @property
+    def scaler(self):
+        self._load()
+        return self._scaler
+
+    def transform(self, df):
+        """Feature matrix in schema order, scaled like the training data."""
+        missing = [f for f in self.features if f not in df.columns]
+        if missing:
+            raise KeyError(f"{self.name} v{self.version} needs columns {missing}")
+        X = df[self.features]
+        first = self.scaler if self.scaler is not None else self.estimator
+        if not hasattr(first, "feature_names_in_"):  # fitted on a bare array
+            X = X.to_numpy(dtype=np.float64)
+        return self.scaler.transform(X) if self.scaler is not None else X
+
+    def predict(self, df):
+        return self.estimator.predict(self.transform(df))
+
+    def predict_proba(self, df):
+        return self.estimator.predict_proba(self.transform(df))
+
+    def __repr__(self):
+        return f"<ModelBundle {self.name} v{self.version} ({self.meta['estimator']})>"
+
+
+# --- Layout ---
+def _model_dir(name, registry):
+    return os.path.join(registry, name)
+
+
+def _version_dir(name, version, registry):
+    return os.path.join(_model_dir(name, registry), f"v{version:03d}")
+
+
+def list_versions(name, registry=REGISTRY_DIR):
+    root = _model_dir(name, registry)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        int(d[1:]) for d in os.listdir(root)
+        if d.startswith("v") and d[1:].isdigit() and os.path.exists(os.path.join(root, d, _META))
+    )
+
+
+def list_models(registry=REGISTRY_DIR):
+    if not os.path.isdir(registry):
+        return []
+    return sorted(name for name in os.listdir(registry) if list_versions(name, registry))
+
+
+def has_model(name, registry=REGISTRY_DIR):
+    return bool(list_versions(name, registry))
+
+
+def latest_meta_path(name, registry=REGISTRY_DIR):
+    """meta.json of the newest version of `name` (None if unregistered); its mtime is when it was saved."""
+    versions = list_versions(name, registry)
+    return os.path.join(_version_dir(name, versions[-1], registry), _META) if versions else None
+
+
+# --- Saving / loading ---
+def save_model(name, estimator, features, scaler=None, registry=REGISTRY_DIR, **info):
+    """
+    Register a fitted estimator (and the scaler its inputs go through) as the
+    next version of `name`. Extra keyword arguments (metrics, sources, ...)
+    are stored in meta.json. Returns the loaded ModelBundle.
+    """
+    versions = list_versions(name, registry)
+    version = versions[-1] + 1 if versions else 1
+    meta = {
+        "name": name,
+        "version": version,
+        "features": list(features),
+        "estimator": type(estimator).__name__,
+        "scaler": type(scaler).__name__ if scaler is not None else None,
+        "sklearn": sklearn.__version__,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **info,
+    }
+
+    # Write under a private name, then rename, so readers never see half a version
+    os.makedirs(_model_dir(name, registry), exist_ok=True)
+    tmp = os.path.join(_model_dir(name, registry), f"tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    joblib.dump({"estimator": estimator, "scaler": scaler}, os.path.join(tmp, _BUNDLE))
+    with open(os.path.join(tmp, _META), "w") as f:
+        json.dump(meta, f, indent=1, default=str)
+    os.rename(tmp, _version_dir(name, version, registry))
+    return load_model(name, version, registry)
+
+
+def load_model(name, version=None, registry=REGISTRY_DIR):
+    """ModelBundle for `name` (latest version by default); the estimator loads on first use."""
+    versions = list_versions(name, registry)
+    if not versions:
+        raise FileNotFoundError(f"No model '{name}' registered in {registry}/")
+    version = versions[-1] if version is None else version
+    key = (os.path.abspath(registry), name, version)
+    if key not in _LOADED:
+        path = _version_dir(name, version, registry)
+        with open(os.path.join(path, _META)) as f:
+            _LOADED[key] = ModelBundle(path, json.load(f))
+    return _LOADED[key]
+
+
+def main():
+    registry = sys.argv[1] if len(sys.argv) > 1 else REGISTRY_DIR
+    names = list_models(registry)
+    if not names:
+        print(f"📭 No models registered in {registry}/")
+        return
+    print(f"📦 Models in {registry}/")
+    for name in names:
+        bundle = load_model(name, registry=registry)
+        bundle.estimator  # cold load
+        versions = ", ".join(f"v{v}" for v in list_versions(name, registry))
+        print(f"   {name:<22} {versions:<14} {bundle.meta['estimator']:<24} "
+              f"{len(bundle.features)} features  load {bundle.load_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
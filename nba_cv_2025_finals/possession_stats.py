@@ -0,0 +1,68 @@
+# possession_stats.py
+"""
+Vectorized frame aggregates and possession segmentation for detection tables.
+
+Everything is a grouped reduction over flat arrays (np.unique + np.bincount),
+so a full game of 30fps detections is processed in one pass with no Python
+loop over frames or possessions.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def frame_spread(frame, cx, cy, min_players=2):
+    """
+    Per-frame centroid and spread (mean player distance to the centroid).
+
+    Frames with fewer than `min_players` detections are dropped. Returns a
+    DataFrame with frame, center_x, center_y, spread, players.
+    """
+    cx = np.asarray(cx, dtype=np.float64)
+    cy = np.asarray(cy, dtype=np.float64)
+    frames, inverse, counts = np.unique(np.asarray(frame), return_inverse=True, return_counts=True)
+
+    center_x = np.bincount(inverse, weights=cx) / counts
+    center_y = np.bincount(inverse, weights=cy) / counts
+    dist = np.hypot(cx - center_x[inverse], cy - center_y[inverse])
+    spread = np.bincount(inverse, weights=dist) / counts
+
+    keep = counts >= min_players
+    return pd.DataFrame({
+        "frame": frames[keep],
+        "center_x": center_x[keep],
+        "center_y": center_y[keep],
+        "spread": spread[keep],
+        "players": counts[keep],
+    })
+
+
+def assign_possessions(stats, time_gap_thresh=15, spread_thresh=100):
+    """
+    Add frame_diff, spread_change, new_possession and possession_id columns.
+
+    A possession starts when the frame gap exceeds `time_gap_thresh` or the
+    spread jumps by more than `spread_thresh`; ids are the running count of
+    those breaks.
+    """
+    stats = stats.copy()
+    stats["frame_diff"] = stats["frame"].diff().fillna(1)
+    stats["spread_change"] = stats["spread"].diff().fillna(0)
+    stats["new_possession"] = (
+        (stats["frame_diff"] > time_gap_thresh) |
+        (stats["spread_change"].abs() > spread_thresh)
+    ).astype(int)
+    stats["possession_id"] = stats["new_possession"].cumsum()
+    return stats
+
+
+def summarize_possessions(stats, fps=30):
+    """One row per possession: start/end frame, duration and average spread."""
+    summary = stats.groupby("possession_id", sort=True).agg(
+        start_frame=("frame", "min"),
+        end_frame=("frame", "max"),
+        avg_spread=("spread", "mean"),
+    ).reset_index()
+    summary.insert(3, "duration_frames", summary["end_frame"] - summary["start_frame"])
+    summary["duration_sec"] = summary["duration_frames"] / fps
+    return summary
@@ -0,0 +1,97 @@
+# raster.py
+"""
+Raster aggregation for scatter plots with too many points to draw one by one.
+
+Points are binned into a NumPy image at roughly screen resolution: per-pixel
+count, mean of a value (speed, xFG, ...) or majority category. The image is
+then composited onto the axes with a single imshow, with empty pixels left
+transparent so the court underneath shows through. Drawing cost depends on
+the image size, not on the number of points.
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+
+RASTER_MIN_POINTS = 20000  # below this, plain scatter is fast enough and looks sharper
+CELL_PX = 2                # screen pixels per raster cell
+
+
+def axes_shape(ax, cell_px=CELL_PX):
+    """(rows, cols) of a raster matching the axes' on-screen size."""
+    fig = ax.figure
+    bbox = ax.get_position()
+    width = bbox.width * fig.get_figwidth() * fig.dpi
+    height = bbox.height * fig.get_figheight() * fig.dpi
+    return max(int(height / cell_px), 1), max(int(width / cell_px), 1)
+
+
+def rasterize(x, y, extent, shape, values=None, how="count", n_categories=None):
+    """
+    Aggregate points into an image of `shape` (rows, cols) covering `extent`
+    (x0, x1, y0, y1); row 0 is the bottom (imshow origin="lower").
+
+    how="count"    points per pixel (0 where empty)
+    how="mean"     mean of `values` per pixel (NaN where empty)
+    how="majority" most common integer category in `values` (-1 where empty)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x0, x1, y0, y1 = extent
+    rows, cols = shape
+    ix = np.floor((x - x0) / (x1 - x0) * cols).astype(np.int64)
+    iy = np.floor((y - y0) / (y1 - y0) * rows).astype(np.int64)
+    # Points exactly on the far edge belong to the last pixel
+    ix[x == x1] = cols - 1
+    iy[y == y1] = rows - 1
+    inside = (ix >= 0) & (ix < cols) & (iy >= 0) & (iy < rows)
+    flat = iy[inside] * cols + ix[inside]
+    counts = np.bincount(flat, minlength=rows * cols)
+
+    if how == "count":
+        return counts.reshape(shape)
+
+    values = np.asarray(values)[inside]
+    if how == "mean":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.bincount(flat, weights=values.astype(np.float64), minlength=rows * cols) / counts
+        return mean.reshape(shape)
+
+    if how == "majority":
+        values = values.astype(np.int64)
+        n = int(n_categories if n_categories is not None else values.max() + 1 if len(values) else 1)
+        votes = np.bincount(flat * n + values, minlength=rows * cols * n).reshape(rows * cols, n)
+        winner = votes.argmax(axis=1)
+        winner[counts == 0] = -1
+        return winner.reshape(shape)
+
+    raise ValueError(f"Unknown aggregation '{how}' (use count, mean or majority)")
+
+
+def raster_scatter(ax, x, y, extent, values=None, how="count", cmap=None, norm=None,
+                   colors=None, alpha=1.0, shape=None, zorder=2):
+    """
+    Draw points as an aggregated image on `ax`; returns the AxesImage.
+
+    For how="majority", `colors` gives one color per category. Otherwise the
+    image is color-mapped with `cmap`/`norm` (usable with fig.colorbar).
+    """
+    shape = axes_shape(ax) if shape is None else shape
+    aspect = ax.get_aspect()  # imshow would otherwise reset it
+    image = rasterize(x, y, extent, shape, values, how, len(colors) if colors is not None else None)
+
+    if how == "majority":
+        palette = np.array([to_rgba(c, alpha) for c in colors] + [(0, 0, 0, 0)])
+        rgba = palette[image]  # -1 (empty) picks the transparent last entry
+        return ax.imshow(rgba, extent=extent, origin="lower", aspect=aspect,
+                         interpolation="nearest", zorder=zorder)
+
+    data = np.ma.masked_where(image == 0, image) if how == "count" else np.ma.masked_invalid(image)
+    return ax.imshow(data, extent=extent, origin="lower", aspect=aspect, cmap=cmap, norm=norm,
+                     alpha=alpha, interpolation="nearest", zorder=zorder)
+
+
+def legend_handles(labels, colors):
+    """Marker proxies for a legend, since an image has no per-category handles."""
+    return [plt.Line2D([0], [0], marker='o', color='w', label=label, markerfacecolor=color, markersize=10)
+            for label, color in zip(labels, colors)]
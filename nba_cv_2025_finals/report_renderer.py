@@ -0,0 +1,240 @@
+# report_renderer.py
+"""
+Headless chart rendering for one or many games.
+
+The figure builders here are shared by the analysis scripts, so a chart looks
+the same whether a script draws it or the batch renderer does. Courts are
+blitted from a cached raster (court_utils.court_background) rather than
+rebuilt from patches, and the density heatmap is drawn as a banded image
+instead of a 50-level contourf.
+
+Batch mode renders every chart for each game in a process pool on the Agg
+backend, so a full slate is bounded by CPU count rather than serial
+matplotlib calls:
+
+    python report_renderer.py game1_detections.csv game2_detections.csv --jobs 4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib
+import matplotlib.pyplot as plt
+import seaborn as sns
+from matplotlib.colors import BoundaryNorm, LogNorm, Normalize
+from court_utils import draw_court_background
+from raster import raster_scatter, legend_handles, RASTER_MIN_POINTS
+
+REPORT_DIR = "reports"
+HEATMAP_LEVELS = 50
+COURT_EXTENT = (0, 50, 0, 47)
+_NON_INTERACTIVE = {"agg", "pdf", "ps", "svg", "pgf", "cairo", "template"}
+
+
+# --- Saving ---
+def save_figure(fig, path, dpi=None):
+    """Save, show only on an interactive backend, and free the figure."""
+    fig.savefig(path, dpi=dpi if dpi is not None else "figure")
+    if matplotlib.get_backend().lower() not in _NON_INTERACTIVE:
+        plt.show()
+    plt.close(fig)
+    return path
+
+
+# --- Figure builders ---
+def heatmap_figure(xgrid, ygrid, Z, title="🔥 Player Movement Heatmap"):
+    fig, ax = plt.subplots(figsize=(8, 7))
+    cmap = sns.color_palette("rocket", as_cmap=True)
+    if Z.max() > Z.min():
+        norm = BoundaryNorm(np.linspace(Z.min(), Z.max(), HEATMAP_LEVELS + 1), cmap.N)  # banded like contourf
+    else:  # constant grid (empty or degenerate game): nothing to band
+        norm = Normalize(Z.min(), Z.min() + 1)
+    heat = ax.imshow(Z, extent=(xgrid[0], xgrid[-1], ygrid[0], ygrid[-1]), origin="lower",
+                     cmap=cmap, norm=norm, interpolation="nearest")
+    draw_court_background(ax, title=title)
+    fig.colorbar(heat, ax=ax, label="Movement Density")
+    fig.tight_layout()
+    return fig
+
+
+def _use_raster(n, raster):
+    """raster=None picks raster aggregation automatically for large point counts."""
+    return n >= RASTER_MIN_POINTS if raster is None else raster
+
+
+def zone_figure(x, y, zone, k, title="🧬 Movement Zone Clusters", raster=None):
+    fig, ax = plt.subplots(figsize=(8, 7))
+    draw_court_background(ax, title=title)
+    palette = sns.color_palette("Set2", k)
+    zone = np.asarray(zone)
+    if _use_raster(len(zone), raster):
+        # Majority zone per pixel
+        raster_scatter(ax, x, y, COURT_EXTENT, values=zone, how="majority", colors=palette, alpha=0.8)
+        ax.legend(handles=legend_handles([f"Zone {i+1}" for i in range(k)], palette), loc='upper right')
+    else:
+        for i in range(k):
+            mask = zone == i
+            ax.scatter(np.asarray(x)[mask], np.asarray(y)[mask], s=8, color=palette[i], label=f"Zone {i+1}", alpha=0.5)
+        ax.legend(loc='upper right')
+    fig.tight_layout()
+    return fig
+
+
+def shot_chart_figure(shot_df, title="Estimated Shot Locations", raster=None):
+    fig, ax = plt.subplots(figsize=(6, 6))
+    draw_court_background(ax, title=title)
+    if _use_raster(len(shot_df), raster):
+        # Shots per pixel, log-scaled so isolated shots stay visible
+        img = raster_scatter(ax, shot_df['x_norm'], shot_df['y_norm'], COURT_EXTENT, how="count",
+                             cmap='Reds', norm=LogNorm(vmin=1))
+        fig.colorbar(img, ax=ax, label='Estimated Shots', shrink=0.8)
+        ax.legend(handles=legend_handles(['Estimated Shot'], ['red']))
+    else:
+        ax.scatter(shot_df['x_norm'], shot_df['y_norm'], c='red', s=30, label='Estimated Shot')
+        ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def xfg_figure(shot_df, title="🎯 Estimated Shot Difficulty — xFG%", raster=None):
+    fig, ax = plt.subplots(figsize=(8, 7))
+    draw_court_background(ax, title=title)
+    if _use_raster(len(shot_df), raster):
+        # Mean xFG per pixel
+        sc = raster_scatter(ax, shot_df['shot_distance_ft'], shot_df['defender_distance_ft'], COURT_EXTENT,
+                            values=shot_df['xFG'], how="mean", cmap='coolwarm', norm=plt.Normalize(0, 1))
+    else:
+        sc = ax.scatter(
+            shot_df['shot_distance_ft'],
+            shot_df['defender_distance_ft'],
+            c=shot_df['xFG'],
+            cmap='coolwarm',
+            edgecolor='k',
+            s=80
+        )
+    fig.colorbar(sc, ax=ax, label='xFG Probability')
+    ax.set_xlabel("Distance to Hoop (ft)")
+    ax.set_ylabel("Nearest Defender Distance (ft)")
+    fig.tight_layout()
+    return fig
+
+
+def timeline_figure(stats_df, summary_df, title="🏀 Player Spread Over Time — Possession Markers"):
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(stats_df['frame'], stats_df['spread'], color='purple', lw=1.5)
+    ax.vlines(summary_df['start_frame'], 0, 1, transform=ax.get_xaxis_transform(),
+              color='gray', ls='--', alpha=0.5)
+    ax.set_title(title)
+    ax.set_xlabel("Frame")
+    ax.set_ylabel("Avg Player Spread (px)")
+    fig.tight_layout()
+    return fig
+
+
+# --- Batch rendering ---
+def game_name(path):
+    """Report folder name: the file stem without a trailing _detections (game1_detections.csv → game1)."""
+    stem = os.path.splitext(os.path.basename(os.path.normpath(str(path))))[0]
+    return stem[:-len("_detections")] if stem.endswith("_detections") and stem != "_detections" else stem
+
+
+def game_charts(path, out_dir=REPORT_DIR):
+    """Compute and render every chart for one detections table; returns (game, {chart: seconds})."""
+    # Only batch mode needs the analysis modules; scripts importing the figure builders skip them
+    from detection_loader import load_detections
+    from density import binned_kde, MIN_POINTS
+    from possession_stats import frame_spread, assign_possessions, summarize_possessions
+    from shot_locations import shot_locations
+    from shot_features import shot_features
+    from model_registry import has_model, load_model
+    from zones import has_zones, load_zones, assign_zones
+
+    game = game_name(path)
+    game_dir = os.path.join(out_dir, game)
+    os.makedirs(game_dir, exist_ok=True)
+    timings = {}
+
+    def render(name, build):
+        start = time.perf_counter()
+        save_figure(build(), os.path.join(game_dir, name))
+        timings[name] = time.perf_counter() - start
+
+    df = load_detections(path, columns=['frame', 'cx', 'cy', 'x_norm', 'y_norm'])
+
+    stats_df = assign_possessions(frame_spread(df['frame'], df['cx'], df['cy']))
+    summary_df = summarize_possessions(stats_df)
+    render("possession_timeline.png", lambda: timeline_figure(stats_df, summary_df))
+
+    xgrid = np.linspace(0, 50, 500)
+    ygrid = np.linspace(0, 47, 470)
+    Z = np.zeros((len(ygrid), len(xgrid)))
+    if len(df) >= MIN_POINTS:
+        try:
+            Z = binned_kde(df['x_norm'].to_numpy(), df['y_norm'].to_numpy(), xgrid, ygrid, bw_method=0.3)
+        except np.linalg.LinAlgError:  # all points on a line: no covariance for the kernel
+            pass
+    render("movement_heatmap.png", lambda: heatmap_figure(xgrid, ygrid, Z, f"🔥 Player Movement Heatmap — {game}"))
+
+    if has_zones():
+        zones = load_zones()
+        zone = assign_zones(df, zones)
+        render("movement_clusters.png",
+               lambda: zone_figure(df['x_norm'], df['y_norm'], zone, zones.meta['k'],
+                                   f"🧬 Movement Zone Clusters — {game}"))
+
+    shots = load_detections(path, labels=None, columns=['frame', 'cx', 'cy'])
+    render("shot_chart.png", lambda: shot_chart_figure(shot_locations(shots), f"Estimated Shot Locations — {game}"))
+
+    shot_df = shot_features(df)
+    if len(shot_df) and has_model("shot_difficulty"):
+        bundle = load_model("shot_difficulty")
+        shot_df['xFG'] = bundle.predict_proba(shot_df)[:, 1]
+        render("xfg_scatter.png", lambda: xfg_figure(shot_df))
+
+    return game, timings
+
+
+def _init_worker():
+    matplotlib.use("Agg", force=True)
+
+
+def render_games(paths, out_dir=REPORT_DIR, jobs=None):
+    """Render all charts for many games in parallel; yields (game, timings) in input order."""
+    names = {}
+    for path in paths:
+        names.setdefault(game_name(path), []).append(str(path))
+    clashes = {game: sources for game, sources in names.items() if len(sources) > 1}
+    if clashes:
+        detail = "; ".join(f"{game}: {', '.join(sources)}" for game, sources in clashes.items())
+        raise ValueError(f"Several inputs would share a report folder under {out_dir}/ ({detail})")
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+    if jobs <= 1:
+        _init_worker()
+        for path in paths:
+            yield game_charts(path, out_dir)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        futures = [pool.submit(game_charts, path, out_dir) for path in paths]
+        for future in futures:
+            yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render chart reports for one or more games")
+    parser.add_argument("detections", nargs="+", help="detection tables (e.g. game1_detections.csv)")
+    parser.add_argument("--out", default=REPORT_DIR, help="output directory (one folder per game)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="games rendered at once")
+    args = parser.parse_args()
+
+    start = time.time()
+    print(f"🖼️  Rendering {len(args.detections)} game(s) with up to {args.jobs} workers...")
+    for game, timings in render_games(args.detections, args.out, args.jobs):
+        charts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+        print(f"   ✅ {game}: {charts}")
+    print(f"⏱️  Done in {time.time() - start:.1f}s → {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,105 +1,260 @@
 #!/usr/bin/env python3
 """
-Run all NBA Computer Vision Analysis scripts in sequence
+Run all NBA Computer Vision Analysis scripts as a dependency graph.
+
+Each stage declares the data files it reads and writes, and the registered
+models it uses. Stages whose inputs are ready run concurrently, each in its
+own process, and a stage is skipped when all of its outputs are newer than its
+inputs, its script and the local helper modules the script imports, and no
+model it uses was refit since it last ran. Tables count as their columnar
+store (manifest) as well as their CSV.
+
+Usage:
+    python run_all.py              # run whatever is out of date
+    python run_all.py --force      # re-run every stage
+    python run_all.py --jobs 2     # cap concurrent stages (default: CPU count)
 """
 
+import argparse
+import ast
 import os
 import sys
 import subprocess
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from columnar_store import has_store, store_path, MANIFEST
+from model_registry import latest_meta_path
 
-def run_script(script_name, description):
-    """Run a Python script and handle errors"""
-    print(f"\n{'='*60}")
-    print(f"🏀 {description}")
-    print(f"📝 Running: {script_name}")
-    print(f"{'='*60}")
-    
-    try:
-        result = subprocess.run([sys.executable, script_name], 
-                              capture_output=True, text=True, check=True)
-        print(f"✅ {script_name} completed successfully")
-        if result.stdout:
-            print("Output:", result.stdout.strip())
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {script_name} failed with error:")
-        print(f"Error: {e.stderr}")
+# Define the analysis pipeline: script, description, data inputs, outputs, registered models used
+PIPELINE = [
+    {
+        "script": "detect_and_log.py",
+        "description": "Player Detection & Tracking",
+        "inputs": ["yolov8n.pt", "game1_highlights.mp4"],
+        "outputs": ["game1_detections.csv"],
+    },
+    {
+        "script": "possession_tracker.py",
+        "description": "Possession Analysis",
+        "inputs": ["game1_detections.csv"],
+        "outputs": ["possessions_summary.csv", "possession_timeline.png"],
+    },
+    {
+        "script": "shot_chart.py",
+        "description": "Shot Chart Generation",
+        "inputs": ["game1_detections.csv"],
+        "outputs": ["game1_shot_chart.png"],
+    },
+    {
+        "script": "shot_difficulty_model.py",
+        "description": "Shot Difficulty Analysis",
+        "inputs": ["game1_detections.csv"],
+        "outputs": ["shot_difficulty_output.csv", "xfg_scatter.png"],
+        "models": ["shot_difficulty"],
+    },
+    {
+        "script": "heatmap_generator.py",
+        "description": "Movement Analytics",
+        "inputs": ["game1_detections.csv"],
+        "outputs": ["movement_heatmap.png", "movement_clusters.png", "movement_zone_summary.csv"],
+        "models": ["movement_zones"],
+    },
+]
+
+
+# --- Dependency graph ---
+def local_imports(script, seen=None):
+    """The script plus every module in this directory it imports, recursively."""
+    seen = set() if seen is None else seen
+    if script in seen or not os.path.exists(script):
+        return seen
+    seen.add(script)
+    with open(script) as f:
+        tree = ast.parse(f.read(), filename=script)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            local_imports(name.split(".")[0] + ".py", seen)
+    return seen
+
+
+def build_graph(pipeline):
+    """Map each script to the scripts producing its inputs."""
+    producers = {out: stage["script"] for stage in pipeline for out in stage["outputs"]}
+    return {
+        stage["script"]: sorted({producers[i] for i in stage["inputs"] if i in producers})
+        for stage in pipeline
+    }
+
+
+def artifact_files(path):
+    """Files standing for a pipeline file: itself and, for a table, its columnar store manifest."""
+    files = [path] if os.path.exists(path) else []
+    if path.endswith(".csv") and has_store(path):
+        files.append(os.path.join(store_path(path), MANIFEST))
+    return files
+
+
+def exists(path):
+    return bool(artifact_files(path))
+
+
+def is_up_to_date(stage):
+    """True if every output exists and is newer than every input, script, helper module and model."""
+    if not all(exists(out) for out in stage["outputs"]):
         return False
-    except FileNotFoundError:
-        print(f"❌ {script_name} not found")
+    sources = [f for i in stage["inputs"] for f in artifact_files(i)] + sorted(local_imports(stage["script"]))
+    newest_input = max(os.path.getmtime(s) for s in sources)
+    # An output is as new as the last of its files written (CSV export or store manifest)
+    written = [max(os.path.getmtime(f) for f in artifact_files(out)) for out in stage["outputs"]]
+    if min(written) < newest_input:
         return False
+    # A stage may register a model itself before writing its last output; a version saved
+    # after that (e.g. by zones.py) means the outputs were built with an older model
+    models = [latest_meta_path(name) for name in stage.get("models", [])]
+    return all(os.path.getmtime(m) <= max(written) for m in models if m is not None)
+
+
+# --- Stage execution ---
+def run_script(script_name):
+    """Run a Python script in its own process; returns (ok, stdout, stderr, peak_mb)"""
+    env = dict(os.environ, MPLBACKEND="Agg")  # headless: plt.show() must not block a worker
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen([sys.executable, script_name], stdout=out, stderr=err, env=env)
+        if hasattr(os, "wait4"):
+            # wait4 reports this child's own resource usage, including peak RSS
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            peak_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            proc.wait()
+            peak_mb = None
+        out.seek(0)
+        err.seek(0)
+        return proc.returncode == 0, out.read().decode(errors="replace"), err.read().decode(errors="replace"), peak_mb
+
+
+def timed_run(stage):
+    start = time.time()
+    ok, stdout, stderr, peak_mb = run_script(stage["script"])
+    return ok, stdout, stderr, peak_mb, time.time() - start
+
+
+def print_stage_result(stage, ok, stdout, stderr):
+    print(f"\n{'='*60}")
+    print(f"🏀 {stage['description']}")
+    print(f"📝 {stage['script']}")
+    print(f"{'='*60}")
+    if ok:
+        print(f"✅ {stage['script']} completed successfully")
+        if stdout:
+            print("Output:", stdout.strip())
+    else:
+        print(f"❌ {stage['script']} failed with error:")
+        print(f"Error: {stderr}")
+
+
+def run_pipeline(pipeline, jobs, force=False):
+    """Schedule stages over the dependency graph; returns {script: result dict}."""
+    deps = build_graph(pipeline)
+    stages = {stage["script"]: stage for stage in pipeline}
+    results = {}
+    pending = list(stages)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            # Launch (or skip) every stage whose dependencies are settled
+            progressed = True
+            while progressed:
+                progressed = False
+                for script in list(pending):
+                    states = [results.get(d, {}).get("status") for d in deps[script]]
+                    if any(s in ("failed", "blocked") for s in states):
+                        results[script] = {"status": "blocked"}
+                    elif all(s in ("ran", "up to date") for s in states):
+                        stage = stages[script]
+                        missing = [i for i in stage["inputs"] if not exists(i)]
+                        outputs_exist = all(exists(out) for out in stage["outputs"])
+                        if not force and not missing and is_up_to_date(stage):
+                            results[script] = {"status": "up to date"}
+                            print(f"⏭️  {script} is up to date")
+                        elif missing and outputs_exist:
+                            results[script] = {"status": "up to date"}
+                            print(f"⏭️  {script}: missing {', '.join(missing)} — using existing outputs")
+                        elif missing:
+                            results[script] = {"status": "failed", "error": f"missing inputs: {', '.join(missing)}"}
+                            print(f"❌ {script} cannot run — missing: {', '.join(missing)}")
+                        else:
+                            print(f"🚀 Starting {script}")
+                            running[pool.submit(timed_run, stage)] = script
+                    else:
+                        continue
+                    pending.remove(script)
+                    progressed = True
+
+            if not running:
+                break  # nothing left that can start
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                script = running.pop(future)
+                ok, stdout, stderr, peak_mb, seconds = future.result()
+                print_stage_result(stages[script], ok, stdout, stderr)
+                results[script] = {
+                    "status": "ran" if ok else "failed",
+                    "seconds": seconds,
+                    "peak_mb": peak_mb,
+                }
+
+    for script in pending:
+        results[script] = {"status": "blocked"}
+    return results
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the NBA CV analysis pipeline")
+    parser.add_argument("--force", action="store_true", help="re-run every stage, even if up to date")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="max stages running at once")
+    args = parser.parse_args()
+
     print("🏀 NBA Computer Vision Analysis - Full Pipeline")
-    print("This will run all analysis scripts in sequence")
-    
+    print(f"Independent stages run in parallel (up to {args.jobs} at a time); up-to-date stages are skipped")
+
     # Check if we're in the right directory
     if not os.path.exists("detect_and_log.py"):
         print("❌ Please run this script from the nba_cv_2025_finals directory")
         sys.exit(1)
-    
-    # Check for required files
-    required_files = [
-        ("yolov8n.pt", "YOLOv8 model"),
-        ("game1_highlights.mp4", "Video file")
-    ]
-    
-    missing_files = []
-    for file, description in required_files:
-        if not os.path.exists(file):
-            missing_files.append(f"{file} ({description})")
-    
-    if missing_files:
-        print("❌ Missing required files:")
-        for file in missing_files:
-            print(f"   - {file}")
-        print("\nPlease run setup.py first or add the missing files manually")
-        sys.exit(1)
-    
-    # Define the analysis pipeline
-    pipeline = [
-        ("detect_and_log.py", "Player Detection & Tracking"),
-        ("possession_tracker.py", "Possession Analysis"),
-        ("shot_chart.py", "Shot Chart Generation"),
-        ("shot_difficulty_model.py", "Shot Difficulty Analysis"),
-        ("heatmap_generator.py", "Movement Analytics")
-    ]
-    
+
     start_time = time.time()
-    success_count = 0
-    
-    for script, description in pipeline:
-        if run_script(script, description):
-            success_count += 1
-        else:
-            print(f"\n❌ Pipeline stopped due to failure in {script}")
-            break
-    
-    end_time = time.time()
-    duration = end_time - start_time
-    
+    results = run_pipeline(PIPELINE, args.jobs, force=args.force)
+    duration = time.time() - start_time
+
     print(f"\n{'='*60}")
     print("📊 Pipeline Summary")
     print(f"{'='*60}")
-    print(f"✅ Completed: {success_count}/{len(pipeline)} scripts")
+    print(f"   {'stage':<28} {'status':<11} {'wall s':>8} {'peak MB':>9}")
+    for stage in PIPELINE:
+        r = results[stage["script"]]
+        seconds = f"{r['seconds']:.1f}" if "seconds" in r else "-"
+        peak = f"{r['peak_mb']:.0f}" if r.get("peak_mb") is not None else "-"
+        print(f"   {stage['script']:<28} {r['status']:<11} {seconds:>8} {peak:>9}")
+
+    done = sum(r["status"] in ("ran", "up to date") for r in results.values())
+    print(f"✅ Completed: {done}/{len(PIPELINE)} scripts")
     print(f"⏱️  Total time: {duration:.1f} seconds")
-    
-    if success_count == len(pipeline):
+
+    if done == len(PIPELINE):
         print("\n🎉 All analyses completed successfully!")
         print("\nGenerated files:")
-        output_files = [
-            "game1_detections.csv",
-            "possessions_summary.csv", 
-            "shot_difficulty_output.csv",
-            "movement_zone_summary.csv",
-            "possession_timeline.png",
-            "game1_shot_chart.png",
-            "xfg_scatter.png",
-            "movement_heatmap.png",
-            "movement_clusters.png"
-        ]
-        
+        output_files = [out for stage in PIPELINE for out in stage["outputs"]]
+
         for file in output_files:
             if os.path.exists(file):
                 size = os.path.getsize(file)
@@ -107,7 +262,11 @@ def main():
             else:
                 print(f"   ❌ {file} (missing)")
     else:
-        print(f"\n⚠️  Pipeline incomplete. {len(pipeline) - success_count} scripts failed.")
+        print(f"\n⚠️  Pipeline incomplete. {len(PIPELINE) - done} scripts failed or were blocked.")
+        if any("missing" in r.get("error", "") for r in results.values()):
+            print("\nPlease run setup.py first or add the missing files manually")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
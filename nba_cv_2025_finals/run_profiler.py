@@ -0,0 +1,264 @@
+# run_profiler.py
+"""
+Per-stage timings, counters and optional cProfile / tracemalloc for one
+detection run, written as a single JSON summary.
+
+Scripts wrap their hot-path sub-stages (decode, resize, inference, box
+extraction, tracking, write) and bump counters (frames, detections, dropped
+frames). Every stage call is one per-frame sample (batched inference: one per
+batch, with its frame count), summarised as total / mean / p50 / p95 / max.
+
+Disabled (the default), every hook returns immediately or hands back the
+object it was given unchanged — no clock reads, no allocations, no wrapper
+frames — so the instrumentation can stay in the hot loop.
+
+    profiler = RunProfiler("track_players", enabled=PROFILE, mode=PROFILE_MODE)
+    for frame_id, frame in profiler.timed(frames, "decode"):
+        with profiler.stage("resize"):
+            ...
+        profiler.count("frames")
+    profiler.finish()   # → profiles/track_players_<timestamp>.json
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+import numpy as np
+
+PROFILE_DIR = "profiles"
+MODES = (None, "cprofile", "tracemalloc")
+TOP_FUNCTIONS = 25      # cProfile rows kept in the summary (by cumulative time)
+TOP_ALLOCATIONS = 15    # tracemalloc lines kept in the summary
+_NULL = contextlib.nullcontext()
+
+
+class _Stage:
+    """Context manager timing one call of a stage."""
+
+    __slots__ = ("profiler", "name", "items", "start")
+
+    def __init__(self, profiler, name, items):
+        self.profiler = profiler
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start, self.items)
+        return False
+
+
+class _TimedModel:
+    """Detector proxy that records every predict() call as a stage sample."""
+
+    def __init__(self, model, profiler, name):
+        self._model = model
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._model, attr)
+
+    def predict(self, images, *args, **kwargs):
+        start = time.perf_counter()
+        results = self._model.predict(images, *args, **kwargs)
+        self._profiler.add(self._name, time.perf_counter() - start, len(images))
+        return results
+
+
+class RunProfiler:
+    """
+    Instrumentation for one run.
+
+    - stage(name, items=1): context manager timing one call
+    - timed(iterable, name): iterate, timing each next() as a call (e.g. decode)
+    - timed_model(model, name): detector whose predict() calls are timed
+    - count(name, n=1): bump a counter
+    - thread_profile(): context manager for worker threads in cprofile mode
+    - finish(**extra): write the JSON summary and print a short report
+    """
+
+    def __init__(self, name, enabled=False, mode=None, params=None, out_dir=PROFILE_DIR):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; expected one of {MODES}")
+        self.name = name
+        self.enabled = enabled
+        self.mode = mode if enabled else None
+        self.params = params or {}
+        self.out_dir = out_dir
+        self.durations = {}   # stage → [seconds per call]
+        self.items = {}       # stage → [frames per call]
+        self.counters = {}
+        self._profiles = []
+        self._started = time.time()
+        self._start = time.perf_counter()
+        if self.mode == "tracemalloc":
+            tracemalloc.start()
+        elif self.mode == "cprofile":
+            self._main_profile = cProfile.Profile()
+            self._profiles.append(self._main_profile)
+            self._main_profile.enable()
+
+    # --- Hooks ---
+    def stage(self, name, items=1):
+        if not self.enabled:
+            return _NULL
+        return _Stage(self, name, items)
+
+    def add(self, name, seconds, items=1):
+        """Record one call of `name` that took `seconds` for `items` frames."""
+        if not self.enabled:
+            return
+        if name not in self.durations:
+            self.durations[name] = []
+            self.items[name] = []
+        self.durations[name].append(seconds)
+        self.items[name].append(items)
+
+    def timed(self, iterable, name):
+        if not self.enabled:
+            return iterable
+        return self._timed(iter(iterable), name)
+
+    def _timed(self, iterator, name):
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                self.add(name, time.perf_counter() - start)
+                yield item
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    def timed_model(self, model, name="inference"):
+        if not self.enabled:
+            return model
+        return _TimedModel(model, self, name)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextlib.contextmanager
+    def thread_profile(self):
+        """cProfile only sees the thread that enabled it, so each worker thread gets its own."""
+        if self.mode != "cprofile":
+            yield
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Python 3.12+: the main profile already covers every thread
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            self._profiles.append(profile)
+
+    # --- Summary ---
+    def stage_summary(self):
+        wall = time.perf_counter() - self._start
+        stages = {}
+        for name, durations in self.durations.items():
+            seconds = np.asarray(durations)
+            items = np.asarray(self.items[name])
+            per_item = seconds / np.maximum(items, 1)
+            stages[name] = {
+                "calls": len(seconds),
+                "items": int(items.sum()),
+                "total_s": round(float(seconds.sum()), 4),
+                "share": round(float(seconds.sum()) / wall, 4) if wall > 0 else 0.0,
+                "mean_ms": round(1000 * float(seconds.sum()) / max(int(items.sum()), 1), 3),
+                "p50_ms": round(1000 * float(np.percentile(per_item, 50)), 3),
+                "p95_ms": round(1000 * float(np.percentile(per_item, 95)), 3),
+                "max_ms": round(1000 * float(per_item.max()), 3),
+            }
+        return stages
+
+    def _cprofile_summary(self):
+        self._main_profile.disable()
+        stats = pstats.Stats(*self._profiles, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({
+                "function": f"{os.path.basename(filename)}:{line}({function})",
+                "calls": calls,
+                "total_s": round(total, 4),
+                "cumulative_s": round(cumulative, 4),
+            })
+        rows.sort(key=lambda r: r["cumulative_s"], reverse=True)
+        return rows[:TOP_FUNCTIONS]
+
+    def _tracemalloc_summary(self):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        top = snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+        return {
+            "current_mb": round(current / 2**20, 2),
+            "peak_mb": round(peak / 2**20, 2),
+            "top": [
+                {"where": f"{os.path.basename(s.traceback[0].filename)}:{s.traceback[0].lineno}",
+                 "size_mb": round(s.size / 2**20, 3), "count": s.count}
+                for s in top
+            ],
+        }
+
+    def summary(self, **extra):
+        wall = time.perf_counter() - self._start
+        counters = dict(self.counters)
+        if "frames_expected" in counters:
+            counters["dropped_frames"] = max(counters["frames_expected"] - counters.get("frames", 0), 0)
+        frames = counters.get("frames", 0)
+        out = {
+            "run": self.name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started)),
+            "wall_s": round(wall, 4),
+            "fps": round(frames / wall, 2) if wall > 0 else 0.0,
+            "mode": self.mode,
+            "params": self.params,
+            "counters": counters,
+            "stages": self.stage_summary(),
+            **extra,
+        }
+        if self.mode == "cprofile":
+            out["cprofile"] = self._cprofile_summary()
+        elif self.mode == "tracemalloc":
+            out["tracemalloc"] = self._tracemalloc_summary()
+        return out
+
+    def finish(self, **extra):
+        """Write the JSON summary (extra keys are added as-is); returns its path, or None when disabled."""
+        if not self.enabled:
+            return None
+        summary = self.summary(**extra)
+        os.makedirs(self.out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started))
+        path = os.path.join(self.out_dir, f"{self.name}_{stamp}.json")
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=1, default=str)
+
+        print(f"⏱️  Run profile: {summary['counters'].get('frames', 0):,} frames in {summary['wall_s']:.1f}s "
+              f"({summary['fps']:.1f} fps)")
+        print(f"   {'stage':<12} {'total s':>9} {'share':>7} {'mean ms':>9} {'p95 ms':>9}")
+        for name, s in sorted(summary["stages"].items(), key=lambda kv: -kv[1]["total_s"]):
+            print(f"   {name:<12} {s['total_s']:>9.2f} {s['share']:>7.1%} {s['mean_ms']:>9.2f} {s['p95_ms']:>9.2f}")
+        if summary["counters"].get("dropped_frames"):
+            print(f"   ⚠️  {summary['counters']['dropped_frames']:,} dropped frames")
+        print(f"📄 Profile saved to {path}")
+        return path
@@ -0,0 +1,184 @@
+# sharded_detection.py
+"""
+Multi-process detection over keyframe-aligned frame ranges.
+
+A full game is ~86k frames and one model on one process leaves most cores of
+a CPU inference node idle. Here the video is split into frame ranges that
+start on keyframes (so each worker's seek lands without decoding from an
+earlier keyframe), and the ranges run in a process pool. Every worker loads
+its own detector (any detectors.py backend) once and caps its intra-op
+threads at its share of the cores, so workers don't oversubscribe the CPU.
+
+Only detection is sharded. Results come back as (frame_id, boxes) in video
+order and the caller runs its tracker over them in one pass, so player ids
+are exactly what a single-process run gives — there are no shard boundaries
+for tracks to be stitched across. Workers also fill the inference cache
+(inference_cache.py), so a later rerun doesn't touch the model at all.
+
+Keyframes are read with PyAV when it is installed (demux only, no decode);
+without it shards are split evenly and OpenCV seeks to the nearest frame.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from batched_inference import DEFAULT_BATCH_SIZE
+from detectors import backend_weights, load_detector
+from inference_cache import InferenceCache, cached_detections, file_hash
+from video_io import FrameReader, MotionSampler, adaptive_frames, sample_frames
+
+try:
+    import av
+except ImportError:  # PyAV is optional; shards are then split evenly
+    av = None
+
+SHARDS_PER_JOB = 4   # more shards than workers so a slow shard doesn't idle the others
+_EMPTY = np.zeros((0, 6), dtype=np.float32)
+_worker = {}         # per-process model, set by _init_worker
+
+
+# --- Planning ---
+def keyframes(video_path):
+    """Frame indices of the video's keyframes, or None without PyAV."""
+    if av is None:
+        return None
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        rate = stream.average_rate or stream.guessed_rate
+        start = stream.start_time or 0
+        frames = {
+            int(round(float((packet.pts - start) * stream.time_base * rate)))
+            for packet in container.demux(stream)
+            if packet.is_keyframe and packet.pts is not None
+        }
+    return sorted(frames)
+
+
+def plan_shards(start_frame, end_frame, n_shards, keyframe_ids=None):
+    """
+    Split [start_frame, end_frame) into up to `n_shards` contiguous ranges.
+
+    Returns [(first, stop), ...]; the last stop is None (read to the end of
+    the video). Inner boundaries are moved forward to the next keyframe when
+    keyframe_ids are given.
+    """
+    if end_frame is None or end_frame <= start_frame or n_shards <= 1:
+        return [(start_frame, None)]
+    targets = np.linspace(start_frame, end_frame, n_shards + 1)[1:-1].round().astype(int)
+    if keyframe_ids:
+        keys = np.asarray(keyframe_ids)
+        idx = np.searchsorted(keys, targets)
+        targets = np.array([keys[i] for i in idx if i < len(keys)], dtype=int)
+    bounds = [start_frame] + sorted({int(t) for t in targets if start_frame < t < end_frame}) + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# --- Workers ---
+def _init_worker(model_path, backend, precision, threads):
+    cv2.setNumThreads(1)
+    _worker["model"] = load_detector(model_path, backend, precision, threads=threads)
+
+
+def _detect_shard(video_path, first, stop, step, resize, batch_size, use_cache, adaptive, predict_kwargs):
+    """Detections for one frame range: (frame_ids, counts, boxes, cache hits)."""
+    model = _worker["model"]
+    cap = cv2.VideoCapture(video_path)
+    size = resize or (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cache = None
+    if use_cache:
+        cache = InferenceCache(video_path, model, size, conf=predict_kwargs.get("conf"))
+    if adaptive is not None:
+        frames = adaptive_frames(cap, MotionSampler(**adaptive), first, stop_frame=stop)
+    else:
+        max_frames = None if stop is None else -(-(stop - first) // step)
+        frames = sample_frames(cap, step, first, max_frames=max_frames,
+                               skip_decode=cache.has if cache is not None else None)
+    if resize is not None:
+        frames = ((f, cv2.resize(img, resize) if img is not None else None) for f, img in frames)
+
+    reread = FrameReader(video_path, resize)  # for skipped frames evicted before their lookup
+    frame_ids, counts, boxes = [], [], []
+    try:
+        for frame_id, data in cached_detections(model, frames, cache, batch_size, reread, **predict_kwargs):
+            frame_ids.append(frame_id)
+            counts.append(len(data))
+            boxes.append(data)
+    finally:
+        cap.release()
+        reread.close()
+        if cache is not None:
+            cache.close(report=False)
+    return (np.array(frame_ids, dtype=np.int64), np.array(counts, dtype=np.int64),
+            np.concatenate(boxes) if boxes else _EMPTY, cache.hits if cache is not None else 0)
+
+
+# --- Sharded run ---
+def sharded_detections(video_path, model_path, start_frame=0, end_frame=None, step=1, resize=None,
+                       jobs=None, batch_size=DEFAULT_BATCH_SIZE, use_cache=True,
+                       backend="ultralytics", precision="fp32", adaptive=None, **predict_kwargs):
+    """
+    Detect every `step`-th frame from `start_frame` on in a process pool.
+
+    Yields (frame_id, boxes) in frame order like inference_cache.cached_detections,
+    with boxes an (N, 6) [x1, y1, x2, y2, conf, cls] array. `resize` (w, h)
+    resizes frames before inference; `backend`/`precision` pick the detector
+    (see detectors.load_detector); extra keyword arguments (e.g. conf) go to
+    its predict.
+
+    `adaptive` (MotionSampler keyword arguments, e.g. {"min_step": 2,
+    "max_step": 12}) samples each range with video_io.adaptive_frames instead
+    of every `step`-th frame. Each range starts with a fresh sampler, so its
+    first frame is always sampled.
+    """
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+    backend_weights(model_path, backend, precision)  # export once here, not in every worker
+
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    # The frame count is only a container estimate, so the last range reads to the real end
+    stop_at = end_frame if end_frame is not None and not 0 < total <= end_frame else None
+    span_end = stop_at if stop_at is not None else (total or None)
+    shards = plan_shards(start_frame, span_end, jobs * SHARDS_PER_JOB, keyframes(video_path))
+    if stop_at is not None:
+        shards[-1] = (shards[-1][0], stop_at)
+    # Sampled (or, adaptively, probed) frames keep the single-process grid: start_frame + k * step
+    if adaptive is not None:
+        step = MotionSampler(**adaptive).min_step
+    shards = [(first + (start_frame - first) % step, stop) for first, stop in shards]
+    shards = [(first, stop) for first, stop in shards if stop is None or first < stop]
+
+    if use_cache:  # hash once here instead of in every worker
+        file_hash(video_path)
+    print(f"🧩 Sharding frames {start_frame}–{span_end if span_end is not None else 'end'} into "
+          f"{len(shards)} ranges on {jobs} {backend} workers ({threads} threads each)")
+
+    start = time.perf_counter()
+    n_frames = hits = 0
+    # fork: the detection scripts have no __main__ guard, so spawned workers would re-run them
+    context = multiprocessing.get_context("fork")
+    pool = ProcessPoolExecutor(max_workers=min(jobs, len(shards)), mp_context=context,
+                               initializer=_init_worker, initargs=(model_path, backend, precision, threads))
+    try:
+        futures = [
+            pool.submit(_detect_shard, video_path, first, stop, step, resize, batch_size, use_cache, adaptive,
+                        predict_kwargs)
+            for first, stop in shards
+        ]
+        for future in futures:  # in order: results stream out as soon as the next range is done
+            frame_ids, counts, boxes, shard_hits = future.result()
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            for i, frame_id in enumerate(frame_ids.tolist()):
+                yield frame_id, boxes[offsets[i]:offsets[i + 1]]
+            n_frames += len(frame_ids)
+            hits += shard_hits
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"🧩 {n_frames:,} frames in {elapsed:.1f}s ({n_frames / max(elapsed, 1e-9):.1f} fps, "
+          f"{hits:,} from the inference cache)")
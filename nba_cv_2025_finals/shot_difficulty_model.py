@@ -1,100 +1,60 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler
-from court_utils import draw_halfcourt
+from detection_loader import load_detections
+from shot_features import shot_features
+from model_registry import save_model, load_model, has_model
+from report_renderer import xfg_figure, save_figure
 
 # --- Config ---
 COURT_W = 1920
 COURT_H = 1080
 HOOP_X = 960
 HOOP_Y = 1050
+SHOT_FRAME_STEP = 1  # score every frame; e.g. 20 to sample every 20th frame
+K_DEFENDERS = 3      # nearest defenders kept as features
+MODEL_NAME = 'shot_difficulty'
+REFIT_MODEL = False  # False: score with the latest registered model if there is one
 
-# Load detection data
-df = pd.read_csv('game1_detections.csv')
-df = df[df['label'] == 'person']
-df = df[df['conf'] > 0.6]
+# Load confident person detections with player centroids (cached after first run)
+df = load_detections('game1_detections.csv', min_conf=0.6, columns=['frame', 'cx', 'cy'])
 
-# Compute player centroids
-df['cx'] = (df['x1'] + df['x2']) / 2
-df['cy'] = (df['y1'] + df['y2']) / 2
+# Shooter (furthest from hoop) and nearest-defender distances for every frame at once
+shot_frames = df['frame'].unique()[::SHOT_FRAME_STEP]
+features = shot_features(df, hoop=(HOOP_X, HOOP_Y), court_width=COURT_W, k=K_DEFENDERS)
+features = features[features['frame'].isin(shot_frames)].reset_index(drop=True)
 
-# Assume every 20th frame is a potential shot
-shot_frames = df['frame'].unique()[::20]
-shots = []
-
-for frame in shot_frames:
-    frame_df = df[df['frame'] == frame]
-    if len(frame_df) < 2:
-        continue  # need at least shooter + 1 defender
-
-    # Assume shooter is furthest from hoop
-    frame_df['dist_to_hoop'] = np.sqrt((frame_df['cx'] - HOOP_X)**2 + (frame_df['cy'] - HOOP_Y)**2)
-    shooter = frame_df.sort_values('dist_to_hoop', ascending=False).iloc[0]
-    shooter_pos = (shooter['cx'], shooter['cy'])
-
-    # Nearest defender (shortest Euclidean dist)
-    defenders = frame_df[frame_df['cx'] != shooter['cx']]  # crude check
-    if defenders.empty:
-        continue
-
-    defender_dists = np.sqrt((defenders['cx'] - shooter_pos[0])**2 + (defenders['cy'] - shooter_pos[1])**2)
-    nearest_def_dist = defender_dists.min()
-
-    # Distance to hoop (in pixels)
-    shot_distance_px = shooter['dist_to_hoop']
-
-    # Normalize to court size
-    shot_distance_ft = (shot_distance_px / COURT_W) * 50  # approx
-    defender_distance_ft = (nearest_def_dist / COURT_W) * 50
-
-    # Label: simulate make/miss with a soft threshold
-    # Later we’ll use real shot result (if we have ball or hoop state)
-    simulated_make = int(shot_distance_ft < 20 and defender_distance_ft > 3)
-
-    shots.append({
-        'frame': frame,
-        'shot_distance_ft': shot_distance_ft,
-        'defender_distance_ft': defender_distance_ft,
-        'make': simulated_make
-    })
+# Label: simulate make/miss with a soft threshold
+# Later we’ll use real shot result (if we have ball or hoop state)
+features['make'] = ((features['shot_distance_ft'] < 20) & (features['defender_distance_ft'] > 3)).astype(int)
 
 # Build DataFrame
-shot_df = pd.DataFrame(shots)
+shot_df = features[['frame', 'shot_distance_ft', 'defender_distance_ft', 'make']
+                  + [f'defender_{i + 1}_distance_ft' for i in range(K_DEFENDERS)]].copy()
 print("📊 Raw Shot Data Sample:")
 print(shot_df.head())
 
 # --- Model Training (Logistic Regression) ---
-X = shot_df[['shot_distance_ft', 'defender_distance_ft']]
-y = shot_df['make']
+if REFIT_MODEL or not has_model(MODEL_NAME):
+    X = shot_df[['shot_distance_ft', 'defender_distance_ft']]
+    y = shot_df['make']
 
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
 
-model = LogisticRegression()
-model.fit(X_scaled, y)
+    model = LogisticRegression()
+    model.fit(X_scaled, y)
+    bundle = save_model(MODEL_NAME, model, features=list(X.columns), scaler=scaler,
+                        training_rows=len(X), train_accuracy=model.score(X_scaled, y))
+    print(f"💾 Registered {bundle.name} v{bundle.version}")
+else:
+    bundle = load_model(MODEL_NAME)
 
 # Predict xFG%
-shot_df['xFG'] = model.predict_proba(X_scaled)[:, 1]
+shot_df['xFG'] = bundle.predict_proba(shot_df)[:, 1]
+print(f"📂 Scored with {bundle.name} v{bundle.version} (model load {bundle.load_seconds * 1000:.1f} ms)")
 
 # --- Visualize ---
-fig, ax = plt.subplots(figsize=(8, 7))
-draw_halfcourt(ax, title="🎯 Estimated Shot Difficulty — xFG%")
-sc = ax.scatter(
-    shot_df['shot_distance_ft'],
-    shot_df['defender_distance_ft'],
-    c=shot_df['xFG'],
-    cmap='coolwarm',
-    edgecolor='k',
-    s=80
-)
-plt.colorbar(sc, ax=ax, label='xFG Probability')
-ax.set_xlabel("Distance to Hoop (ft)")
-ax.set_ylabel("Nearest Defender Distance (ft)")
-plt.tight_layout()
-plt.savefig("xfg_scatter.png")
-plt.show()
+save_figure(xfg_figure(shot_df), "xfg_scatter.png")
 
 # Save data
 shot_df.to_csv("shot_difficulty_output.csv", index=False)
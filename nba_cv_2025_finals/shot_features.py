@@ -0,0 +1,80 @@
+# shot_features.py
+"""
+Batched shooter / defender features for every frame at once.
+
+Detections are packed into padded (frames × max players) arrays, so the
+shooter (player furthest from the hoop), the shot distance and the distances
+to the k nearest defenders come out of a handful of array operations instead
+of a DataFrame filter and sort per frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+HOOP = (960, 1050)      # hoop position in video px (x, y)
+COURT_WIDTH = 1920      # px across the 50 ft halfcourt
+K_DEFENDERS = 3
+
+
+def padded_frames(frame, *columns):
+    """
+    Pack per-detection columns into (n_frames, max_players) arrays padded with NaN.
+
+    Returns (frames, counts, [padded column, ...]).
+    """
+    frame = np.asarray(frame)
+    order = np.argsort(frame, kind="stable")
+    frame = frame[order]
+    frames, starts, counts = np.unique(frame, return_index=True, return_counts=True)
+    group = np.repeat(np.arange(len(frames)), counts)
+    slot = np.arange(len(frame)) - starts[group]
+    width = int(counts.max()) if len(counts) else 0
+
+    padded = []
+    for col in columns:
+        out = np.full((len(frames), width), np.nan)
+        out[group, slot] = np.asarray(col, dtype=np.float64)[order]
+        padded.append(out)
+    return frames, counts, padded
+
+
+def shot_features(df, hoop=HOOP, court_width=COURT_WIDTH, k=K_DEFENDERS,
+                  frame_col="frame", x_col="cx", y_col="cy"):
+    """
+    One row per frame with at least two players: frame, players, shooter_x,
+    shooter_y, shot_distance_ft, defender_distance_ft (nearest) and
+    defender_<i>_distance_ft for the k nearest (NaN when fewer defenders).
+    """
+    frames, counts, (x, y) = padded_frames(df[frame_col].to_numpy(), df[x_col].to_numpy(), df[y_col].to_numpy())
+    keep = counts >= 2  # need at least shooter + 1 defender
+    frames, counts, x, y = frames[keep], counts[keep], x[keep], y[keep]
+    if len(frames) == 0:  # no detections, or no frame with two players
+        columns = ["frame", "players", "shooter_x", "shooter_y", "shot_distance_ft", "defender_distance_ft"]
+        return pd.DataFrame(columns=columns + [f"defender_{i + 1}_distance_ft" for i in range(k)], dtype=float)
+    rows = np.arange(len(frames))
+
+    # Shooter: furthest from the hoop (padding is NaN → ignored)
+    to_hoop = np.hypot(x - hoop[0], y - hoop[1])
+    shooter = np.argmax(np.where(np.isnan(to_hoop), -np.inf, to_hoop), axis=1)
+    sx, sy = x[rows, shooter], y[rows, shooter]
+
+    # Defender distances, shooter and padding pushed to +inf
+    dist = np.hypot(x - sx[:, None], y - sy[:, None])
+    dist[np.isnan(dist)] = np.inf
+    dist[rows, shooter] = np.inf
+    k_eff = min(k, dist.shape[1])
+    nearest = np.sort(np.partition(dist, k_eff - 1, axis=1)[:, :k_eff], axis=1) if k_eff else dist[:, :0]
+    nearest[np.isinf(nearest)] = np.nan
+
+    px_to_ft = 50 / court_width
+    out = pd.DataFrame({
+        "frame": frames,
+        "players": counts,
+        "shooter_x": sx,
+        "shooter_y": sy,
+        "shot_distance_ft": to_hoop[rows, shooter] * px_to_ft,
+        "defender_distance_ft": nearest[:, 0] * px_to_ft,
+    })
+    for i in range(k):
+        out[f"defender_{i + 1}_distance_ft"] = nearest[:, i] * px_to_ft if i < k_eff else np.nan
+    return out
@@ -0,0 +1,58 @@
+# shot_locations.py
+"""
+Vectorized shot-location extraction.
+
+The shooter in each frame is taken to be the detection furthest from the
+basket. Distances are computed for every detection at once, and the
+per-frame maximum is picked with a grouped reduction (a grouped idxmax)
+instead of a Python loop over frames.
+"""
+
+import numpy as np
+import pandas as pd
+
+BASKET = (960, 1050)        # basket position in video px (x, y)
+RESOLUTION = (1920, 720)    # video px mapped onto the 50×47 ft halfcourt (width, height)
+COURT_FEET = (50, 47)
+
+
+def shooter_rows(frame, cx, cy, basket=BASKET):
+    """Index of the detection furthest from the basket in each frame (first one on ties)."""
+    frame = np.asarray(frame)
+    dist = np.hypot(np.asarray(cx, dtype=np.float64) - basket[0],
+                    np.asarray(cy, dtype=np.float64) - basket[1])
+    # Group rows by frame; detections are normally written in frame order already
+    if len(frame) > 1 and np.any(frame[1:] < frame[:-1]):
+        order = np.argsort(frame, kind="stable")
+    else:
+        order = np.arange(len(frame))
+    if len(order) == 0:
+        return order
+
+    frame, dist = frame[order], dist[order]
+    starts = np.concatenate([[0], np.flatnonzero(frame[1:] != frame[:-1]) + 1])
+    counts = np.diff(np.append(starts, len(frame)))
+    group_max = np.maximum.reduceat(dist, starts)
+
+    # First row in each frame reaching that frame's maximum, like np.argmax
+    hits = np.flatnonzero(dist == np.repeat(group_max, counts))
+    group = np.repeat(np.arange(len(starts)), counts)[hits]
+    first = np.concatenate([[True], group[1:] != group[:-1]])
+    return order[hits[first]]
+
+
+def shot_locations(df, basket=BASKET, resolution=RESOLUTION, frame_col="frame", x_col="cx", y_col="cy"):
+    """
+    One estimated shot per frame: frame, x, y (px) and x_norm, y_norm (ft, y inverted).
+    """
+    rows = shooter_rows(df[frame_col].to_numpy(), df[x_col].to_numpy(), df[y_col].to_numpy(), basket)
+    x = df[x_col].to_numpy()[rows]
+    y = df[y_col].to_numpy()[rows]
+    width, height = resolution
+    return pd.DataFrame({
+        "frame": df[frame_col].to_numpy()[rows],
+        "x": x,
+        "y": y,
+        "x_norm": x / width * COURT_FEET[0],
+        "y_norm": (1 - y / height) * COURT_FEET[1],  # invert y
+    })
@@ -0,0 +1,125 @@
+# synthetic_data.py
+"""
+Seeded synthetic inputs for benchmarks: detections, movement features, a tiny
+video and a stub detector. Nothing here needs a model download or a real
+game, so every stage can be exercised offline and reproducibly.
+
+Players random-walk around the frame (reflecting off the edges) with a
+fixed box size each, and a few percent of detections are dropped to mimic
+missed boxes. The same seed always gives the same rows.
+"""
+
+import cv2
+import numpy as np
+import pandas as pd
+from detectors import Detector
+from kinematics import movement_features
+
+SEED = 0
+PLAYERS = 10
+RESOLUTION = (1920, 1080)      # same as detection_loader.DEFAULT_COURT_SIZE
+COURT_FEET = (50, 47)
+STEP_PX = 0.004                # random-walk step, as a fraction of the frame width
+DROP_RATE = 0.05               # share of detections missed
+VIDEO_FRAMES = 300             # 10s at 30fps
+VIDEO_SIZE = (640, 360)
+_FLOOR_BGR = (60, 120, 180)
+_JERSEYS_BGR = [(240, 240, 240), (0, 220, 255)]
+_STUB_THRESHOLD = 170          # gray level separating jerseys from the floor
+_STUB_MIN_AREA = 40            # px; smaller blobs are compression noise
+
+
+def _reflect(values, lo, hi):
+    """Fold values into [lo, hi] as if they bounced off the edges."""
+    span = hi - lo
+    folded = np.mod(values - lo, 2 * span)
+    return lo + np.where(folded > span, 2 * span - folded, folded)
+
+
+def synthetic_detections(n_rows, players=PLAYERS, seed=SEED, resolution=RESOLUTION, drop_rate=DROP_RATE):
+    """
+    `n_rows` person detections: frame, player_id, label, conf, x1, y1, x2, y2,
+    cx, cy, x_norm, y_norm (the columns of a detection table plus the
+    centroid and court coordinates detection_loader derives).
+    """
+    rng = np.random.default_rng(seed)
+    w, h = resolution
+    n_frames = int(np.ceil(n_rows / players / (1 - drop_rate) * 1.05)) + 2  # margin, trimmed below
+
+    box_w = rng.uniform(0.03, 0.045, players).astype(np.float32) * w
+    box_h = box_w * 2.5
+    start = rng.uniform([0.1 * w, 0.2 * h], [0.9 * w, 0.9 * h], size=(players, 2)).astype(np.float32)
+    steps = rng.normal(0, STEP_PX * w, size=(n_frames, players, 2)).astype(np.float32)
+    pos = start + np.cumsum(steps, axis=0)
+    cx = _reflect(pos[..., 0], box_w / 2, w - box_w / 2).ravel()
+    cy = _reflect(pos[..., 1], box_h / 2, h - box_h / 2).ravel()
+
+    frame = np.repeat(np.arange(n_frames, dtype=np.int32), players)
+    player_id = np.tile(np.arange(players, dtype=np.int32), n_frames)
+    keep = np.flatnonzero(rng.random(len(frame)) >= drop_rate)[:n_rows]
+    half_w = np.tile(box_w / 2, n_frames)[keep]
+    half_h = np.tile(box_h / 2, n_frames)[keep]
+    cx, cy = cx[keep].astype(np.float32), cy[keep].astype(np.float32)
+
+    return pd.DataFrame({
+        "frame": frame[keep],
+        "player_id": player_id[keep],
+        "label": pd.Categorical.from_codes(np.zeros(len(keep), dtype=np.int8), ["person"]),
+        "conf": rng.uniform(0.3, 0.95, len(keep)).astype(np.float32),
+        "x1": cx - half_w, "y1": cy - half_h,
+        "x2": cx + half_w, "y2": cy + half_h,
+        "cx": cx, "cy": cy,
+        "x_norm": cx / w * COURT_FEET[0],
+        "y_norm": (1 - cy / h) * COURT_FEET[1],
+    })
+
+
+def synthetic_features(n_rows, players=PLAYERS, seed=SEED):
+    """About `n_rows` movement-feature rows (as written by game7/extract_features.py)."""
+    # movement_features drops each player's first detection
+    return movement_features(synthetic_detections(n_rows + players, players, seed))
+
+
+def synthetic_video(path, n_frames=VIDEO_FRAMES, size=VIDEO_SIZE, players=PLAYERS, fps=30, seed=SEED):
+    """Write a short MJPG video of players as bright boxes on a plain floor; returns its detections."""
+    dets = synthetic_detections(n_frames * players, players, seed, resolution=size)
+    dets = dets[dets["frame"] < n_frames]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    boxes = dets[["x1", "y1", "x2", "y2"]].to_numpy().round().astype(int)
+    starts = np.searchsorted(dets["frame"].to_numpy(), np.arange(n_frames + 1))
+    ids = dets["player_id"].to_numpy()
+    for f in range(n_frames):
+        image = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        image[:] = _FLOOR_BGR
+        for i in range(starts[f], starts[f + 1]):
+            x1, y1, x2, y2 = boxes[i]
+            cv2.rectangle(image, (x1, y1), (x2, y2), _JERSEYS_BGR[ids[i] % 2], thickness=-1)
+        writer.write(image)
+    writer.release()
+    return dets
+
+
+class StubDetector(Detector):
+    """
+    Model-free Detector for synthetic_video(): thresholds the bright player
+    boxes and returns their connected components as person detections.
+    """
+
+    backend = "stub"
+
+    def __init__(self, weights="stub", imgsz=VIDEO_SIZE[0], conf=0.5, iou=0.7, threads=None):
+        super().__init__(weights, imgsz, conf, iou, threads)
+        self.names = {0: "person"}
+        self.ckpt_path = __file__  # the "weights" are this code, for the inference cache fingerprint
+
+    def predict(self, images, conf=None, iou=None, verbose=False):
+        results = []
+        for image in images:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            _, mask = cv2.threshold(gray, _STUB_THRESHOLD, 255, cv2.THRESH_BINARY)
+            n, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+            stats = stats[1:][stats[1:, cv2.CC_STAT_AREA] >= _STUB_MIN_AREA]  # label 0 is the floor
+            x, y, w, h = (stats[:, i].astype(np.float32) for i in range(4))
+            boxes = np.column_stack([x, y, x + w, y + h, np.full_like(x, 0.9), np.zeros_like(x)])
+            results.append(boxes.astype(np.float32).reshape(-1, 6))
+        return results
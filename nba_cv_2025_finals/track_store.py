@@ -0,0 +1,132 @@
+# track_store.py
+"""
+Array-backed store of per-player track points.
+
+Replaces `{player_id: [(frame, cx, cy), ...]}` dictionaries: points are
+appended into preallocated NumPy columns (capacity doubles when full), so
+memory stays compact and every per-track computation is one vectorized pass
+over all players at once. Point i is row i in append order, which lets
+results be joined straight back onto the detection table by index.
+"""
+
+import numpy as np
+import pandas as pd
+from kinematics import sort_by_track, track_speed_acceleration
+
+_COLUMNS = {"frame": np.int32, "player_id": np.int32, "cx": np.float32, "cy": np.float32}
+
+
+class TrackStore:
+    def __init__(self, capacity=4096):
+        self._size = 0
+        self._data = {name: np.empty(capacity, dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self._carry = None  # last point (and its speed) of each player from earlier drains
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._data["frame"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, column in self._data.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._data[name] = grown
+
+    def append(self, frame, player_id, cx, cy):
+        """Add one point; returns its row index."""
+        self._reserve(1)
+        row = self._size
+        self._data["frame"][row] = frame
+        self._data["player_id"][row] = player_id
+        self._data["cx"][row] = cx
+        self._data["cy"][row] = cy
+        self._size += 1
+        return row
+
+    def extend(self, frames, player_ids, cxs, cys):
+        """Add many points at once (e.g. all detections of one frame)."""
+        n = len(player_ids)
+        self._reserve(n)
+        lo, hi = self._size, self._size + n
+        self._data["frame"][lo:hi] = frames
+        self._data["player_id"][lo:hi] = player_ids
+        self._data["cx"][lo:hi] = cxs
+        self._data["cy"][lo:hi] = cys
+        self._size = hi
+
+    def column(self, name):
+        """View of one column trimmed to the stored points."""
+        return self._data[name][:self._size]
+
+    def player_ids(self):
+        return np.unique(self.column("player_id"))
+
+    def track(self, player_id):
+        """Row indices of one player's points, in frame order."""
+        return np.flatnonzero(self.column("player_id") == player_id)
+
+    def tracks(self):
+        """{player_id: row indices} for every player, from a single sort."""
+        order, new_track = sort_by_track(self.column("player_id"), self.column("frame"))
+        starts = np.flatnonzero(new_track)
+        ids = self.column("player_id")[order[starts]]
+        return {int(pid): rows for pid, rows in zip(ids, np.split(order, starts[1:]))}
+
+    def speed_acceleration(self):
+        """(speed, acceleration) per point, aligned with row order."""
+        return track_speed_acceleration(
+            self.column("player_id"), self.column("frame"), self.column("cx"), self.column("cy")
+        )
+
+    def drain_speed_acceleration(self, max_gap=None):
+        """
+        (speed, acceleration) for the stored points, then empty the store.
+
+        Only each player's last point and speed are kept, so successive drains
+        give the same values as one speed_acceleration() over the whole run
+        while memory stays bounded. Carried points more than `max_gap` frames
+        older than the newest point are forgotten (retired tracks).
+        """
+        n = self._size
+        cols = {name: self.column(name) for name in _COLUMNS}
+        initial = np.zeros(n)
+        if self._carry is not None:
+            carry = self._carry
+            cols = {name: np.concatenate([carry[name], cols[name]]) for name in _COLUMNS}
+            initial = np.concatenate([carry["speed"], initial])
+        speed, acceleration = track_speed_acceleration(
+            cols["player_id"], cols["frame"], cols["cx"], cols["cy"], initial_speed=initial
+        )
+        n_carry = len(speed) - n
+
+        # Keep each player's newest point for the next drain
+        if len(speed):
+            order, new_track = sort_by_track(cols["player_id"], cols["frame"])
+            last = order[np.append(new_track[1:], True)]
+            if max_gap is not None:
+                last = last[cols["frame"][last] >= cols["frame"].max() - max_gap]
+            self._carry = {name: cols[name][last].copy() for name in _COLUMNS}
+            self._carry["speed"] = speed[last]
+        self._size = 0
+        return speed[n_carry:], acceleration[n_carry:]
+
+    def carry_state(self):
+        """JSON-serializable carried points (for checkpoints)."""
+        if self._carry is None:
+            return None
+        return {name: values.tolist() for name, values in self._carry.items()}
+
+    def load_carry_state(self, state):
+        if state is None:
+            self._carry = None
+            return
+        self._carry = {name: np.asarray(state[name], dtype=dtype) for name, dtype in _COLUMNS.items()}
+        self._carry["speed"] = np.asarray(state["speed"], dtype=np.float64)
+
+    def to_frame(self):
+        return pd.DataFrame({name: self.column(name) for name in _COLUMNS})
@@ -0,0 +1,194 @@
+# tracker.py
+"""
+Multi-object tracker that gives detections persistent player ids.
+
+Per frame:
+  1. predict every live track forward with its constant (per-frame) velocity
+  2. build an IoU + centroid-distance cost matrix, tracks × detections, in NumPy
+  3. assign with the Hungarian algorithm (or greedily), rejecting gated pairs
+  4. update matched tracks, start new tracks for unmatched detections, and
+     drop tracks not seen for more than `max_age` frames
+
+Track state lives in flat arrays, so a frame costs a few small matrix ops.
+"""
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy is optional here; greedy matching still works
+    linear_sum_assignment = None
+
+_INVALID = 1e6
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes → (N, M)."""
+    a = np.asarray(a, dtype=np.float64)[:, None, :]
+    b = np.asarray(b, dtype=np.float64)[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1), 0.0)
+
+
+def centroid_distance_matrix(a, b):
+    """Pairwise centroid distance between (N, 4) and (M, 4) xyxy boxes → (N, M)."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    ca = np.stack([(a[:, 0] + a[:, 2]) / 2, (a[:, 1] + a[:, 3]) / 2], axis=1)
+    cb = np.stack([(b[:, 0] + b[:, 2]) / 2, (b[:, 1] + b[:, 3]) / 2], axis=1)
+    return np.linalg.norm(ca[:, None, :] - cb[None, :, :], axis=2)
+
+
+def greedy_assignment(cost):
+    """Lowest-cost-first matching; returns (rows, cols) like linear_sum_assignment."""
+    flat = np.argsort(cost, axis=None, kind="stable")
+    rows, cols = np.unravel_index(flat, cost.shape)
+    used_r = np.zeros(cost.shape[0], dtype=bool)
+    used_c = np.zeros(cost.shape[1], dtype=bool)
+    out_r, out_c = [], []
+    for r, c in zip(rows, cols):
+        if cost[r, c] >= _INVALID:
+            break
+        if not used_r[r] and not used_c[c]:
+            used_r[r] = used_c[c] = True
+            out_r.append(r)
+            out_c.append(c)
+    return np.array(out_r, dtype=int), np.array(out_c, dtype=int)
+
+
+class Tracker:
+    """
+    IoU/centroid tracker with constant-velocity prediction.
+
+    - min_iou / max_distance: a pair is allowed if IoU >= min_iou or the
+      centroid distance is within `max_distance` × the track's box height
+    - max_age: frames a track survives without a match before it dies
+    - velocity_smoothing: weight of the newest velocity estimate (0..1)
+    - method: "hungarian" (optimal, needs scipy) or "greedy"
+    """
+
+    def __init__(self, min_iou=0.1, max_distance=1.0, max_age=30,
+                 velocity_smoothing=0.5, method="hungarian"):
+        if method == "hungarian" and linear_sum_assignment is None:
+            method = "greedy"
+        self.min_iou = min_iou
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.velocity_smoothing = velocity_smoothing
+        self.method = method
+        self.next_id = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.boxes = np.empty((0, 4), dtype=np.float64)
+        self.velocity = np.empty((0, 4), dtype=np.float64)
+        self.last_frame = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def state(self):
+        """JSON-serializable snapshot of the live tracks (for checkpoints)."""
+        return {
+            "next_id": int(self.next_id),
+            "ids": self.ids.tolist(),
+            "boxes": self.boxes.tolist(),
+            "velocity": self.velocity.tolist(),
+            "last_frame": self.last_frame.tolist(),
+        }
+
+    def load_state(self, state):
+        """Restore live tracks from state(), so ids continue after a resume."""
+        self.next_id = int(state["next_id"])
+        self.ids = np.asarray(state["ids"], dtype=np.int64)
+        self.boxes = np.asarray(state["boxes"], dtype=np.float64).reshape(-1, 4)
+        self.velocity = np.asarray(state["velocity"], dtype=np.float64).reshape(-1, 4)
+        self.last_frame = np.asarray(state["last_frame"], dtype=np.int64)
+
+    def predict(self, frame):
+        """Boxes of all live tracks extrapolated to `frame`."""
+        gap = (frame - self.last_frame)[:, None]
+        return self.boxes + self.velocity * gap
+
+    def cost_matrix(self, predicted, detections):
+        iou = iou_matrix(predicted, detections)
+        dist = centroid_distance_matrix(predicted, detections)
+        height = np.maximum(predicted[:, 3] - predicted[:, 1], 1.0)[:, None]
+        norm_dist = dist / height
+        cost = (1.0 - iou) + norm_dist
+        allowed = (iou >= self.min_iou) | (norm_dist <= self.max_distance)
+        return np.where(allowed, cost, _INVALID)
+
+    def _assign(self, cost):
+        if cost.size == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int)
+        if self.method == "greedy":
+            return greedy_assignment(cost)
+        rows, cols = linear_sum_assignment(cost)
+        valid = cost[rows, cols] < _INVALID
+        return rows[valid], cols[valid]
+
+    def update(self, frame, detections):
+        """
+        Match one frame's (N, 4) xyxy detections; returns their N track ids.
+
+        Frames must be passed in increasing order; gaps (frame skipping) are
+        fine, velocities are per frame.
+        """
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 4)
+        out = np.empty(len(detections), dtype=np.int64)
+
+        # Retire tracks that have been missing too long
+        alive = (frame - self.last_frame) <= self.max_age
+        if not alive.all():
+            self.ids, self.boxes = self.ids[alive], self.boxes[alive]
+            self.velocity, self.last_frame = self.velocity[alive], self.last_frame[alive]
+
+        rows, cols = self._assign(self.cost_matrix(self.predict(frame), detections))
+
+        # Update matched tracks
+        if len(rows):
+            gap = np.maximum(frame - self.last_frame[rows], 1)[:, None]
+            measured = (detections[cols] - self.boxes[rows]) / gap
+            a = self.velocity_smoothing
+            self.velocity[rows] = a * measured + (1 - a) * self.velocity[rows]
+            self.boxes[rows] = detections[cols]
+            self.last_frame[rows] = frame
+            out[cols] = self.ids[rows]
+
+        # Births for unmatched detections
+        unmatched = np.setdiff1d(np.arange(len(detections)), cols, assume_unique=True)
+        if len(unmatched):
+            new_ids = np.arange(self.next_id, self.next_id + len(unmatched))
+            self.next_id += len(unmatched)
+            out[unmatched] = new_ids
+            self.ids = np.concatenate([self.ids, new_ids])
+            self.boxes = np.concatenate([self.boxes, detections[unmatched]])
+            self.velocity = np.concatenate([self.velocity, np.zeros((len(unmatched), 4))])
+            self.last_frame = np.concatenate([self.last_frame, np.full(len(unmatched), frame)])
+
+        return out
+
+
+def track_detections(df, frame_col="frame", box_cols=("x1", "y1", "x2", "y2"), **tracker_kwargs):
+    """
+    Run a Tracker offline over a detection table.
+
+    Returns an array of track ids aligned with the rows of `df`.
+    """
+    frames = df[frame_col].to_numpy()
+    boxes = df[list(box_cols)].to_numpy(dtype=np.float64)
+    order = np.argsort(frames, kind="stable")
+    sorted_frames = frames[order]
+    starts = np.flatnonzero(np.r_[True, sorted_frames[1:] != sorted_frames[:-1]])
+    stops = np.r_[starts[1:], len(order)]
+
+    tracker = Tracker(**tracker_kwargs)
+    ids = np.empty(len(df), dtype=np.int64)
+    for lo, hi in zip(starts, stops):
+        rows = order[lo:hi]
+        ids[rows] = tracker.update(int(sorted_frames[lo]), boxes[rows])
+    return ids
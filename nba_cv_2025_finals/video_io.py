@@ -0,0 +1,222 @@
+# video_io.py
+"""
+Frame sampling helpers for OpenCV video captures.
+
+`cap.read()` is `grab()` + `retrieve()`: grab demuxes and decodes the next
+frame, retrieve converts it to a BGR array. When most frames are thrown away
+we only `grab()` the skipped ones, and for very large skips we seek instead,
+which lets the decoder jump to the nearest keyframe.
+
+`adaptive_frames` samples at a motion-dependent stride instead of a fixed
+one: dense during fast breaks, sparse through free throws and timeouts.
+"""
+
+import cv2
+import numpy as np
+
+SEEK_MIN_SKIP = 120  # skips at least this large seek instead of grabbing (~4s at 30fps)
+MOTION_SIZE = (160, 90)  # probes are downscaled to this (w, h) grayscale before differencing
+MOTION_LOW = 0.75        # mean abs gray change per frame at or below which play counts as static
+MOTION_HIGH = 3.0        # ...and at or above which it counts as full action
+MOTION_DECAY = 0.8       # per-probe decay of the motion level; rises are taken at once
+
+
+def _catch_up(cap, position, target, seek_min_skip):
+    """Move the capture from `position` to `target` (grab or seek); False at end of video."""
+    gap = target - position
+    if seek_min_skip is not None and gap + 1 >= seek_min_skip:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        return True
+    for _ in range(gap):
+        if not cap.grab():
+            return False
+    return True
+
+
+def sample_frames(cap, step=1, start_frame=0, max_frames=None, seek_min_skip=SEEK_MIN_SKIP,
+                  skip_decode=None):
+    """
+    Yield (frame_id, frame) for every `step`-th frame from `start_frame` on.
+
+    `frame_id` is the absolute frame index in the video, exactly as if every
+    frame had been read with `cap.read()`. Only the yielded frames are
+    retrieved (color-converted); the rest are grabbed or seeked past.
+    Pass seek_min_skip=None to never seek (e.g. for inaccurate-seek codecs).
+
+    `skip_decode` is an optional predicate on frame_id; frames it accepts
+    (e.g. ones whose detections are already cached) are yielded as None and
+    not decoded at all. The capture catches up lazily at the next frame that
+    is needed, so a run of skipped frames costs one seek or nothing.
+    """
+    if step < 1:
+        raise ValueError(f"step must be >= 1, got {step}")
+
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    frame_id = start_frame
+    position = start_frame  # frame the next cap.read() returns
+    sampled = 0
+    while cap.isOpened() and (max_frames is None or sampled < max_frames):
+        if skip_decode is not None and skip_decode(frame_id):
+            yield frame_id, None
+        else:
+            if not _catch_up(cap, position, frame_id, seek_min_skip):
+                return
+            ret, frame = cap.read()
+            if not ret:
+                break
+            position = frame_id + 1
+            yield frame_id, frame
+        sampled += 1
+        frame_id += step
+
+
+class FrameReader:
+    """
+    Random access to single frames through a second capture.
+
+    For frames sample_frames(skip_decode=...) passed over that turn out to be
+    needed after all, e.g. because their cached detections were evicted
+    between the skip decision and the lookup. `resize` (w, h) matches the
+    resizing the main stream applies.
+    """
+
+    def __init__(self, video_path, resize=None):
+        self.video_path = video_path
+        self.resize = resize
+        self.cap = None
+        self.reads = 0
+
+    def __call__(self, frame_id):
+        if self.cap is None:
+            self.cap = cv2.VideoCapture(self.video_path)
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_id)
+        ret, frame = self.cap.read()
+        if not ret:
+            raise IOError(f"Can't read frame {frame_id} of {self.video_path}")
+        self.reads += 1
+        return cv2.resize(frame, self.resize) if self.resize is not None else frame
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+# --- Motion-adaptive sampling ---
+def motion_thumbnail(frame, size=MOTION_SIZE):
+    """Small grayscale copy of a BGR frame for motion scoring."""
+    return cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+
+
+def motion_score(prev, cur):
+    """Mean absolute gray-level change between two thumbnails of consecutive frames."""
+    return float(cv2.absdiff(prev, cur).mean())
+
+
+class MotionSampler:
+    """
+    Stride policy for adaptive_frames.
+
+    The motion level jumps up with the score and decays by MOTION_DECAY per
+    probe, so sampling densifies the moment action starts and stays dense
+    briefly after it stops. The stride goes linearly from max_step (level <=
+    low) to min_step (level >= high); a frame is sampled once that many frames
+    have passed since the last sampled one.
+    """
+
+    def __init__(self, min_step=2, max_step=12, low=MOTION_LOW, high=MOTION_HIGH, decay=MOTION_DECAY):
+        if not 1 <= min_step <= max_step:
+            raise ValueError(f"Need 1 <= min_step <= max_step, got {min_step}, {max_step}")
+        self.min_step = min_step
+        self.max_step = max_step
+        self.low = low
+        self.high = high
+        self.decay = decay
+        self.level = None
+        self.last_sampled = None
+        self.first_frame = None
+        self.last_frame = None
+        self.probes = 0
+        self.sampled = 0
+
+    def step(self):
+        """Current stride in frames."""
+        if self.level is None:
+            return self.min_step
+        t = np.clip((self.level - self.low) / max(self.high - self.low, 1e-9), 0.0, 1.0)
+        return int(round(self.max_step - t * (self.max_step - self.min_step)))
+
+    def update(self, frame_id, score):
+        """Feed one probe's motion score (None for the first probe); True if it should be sampled."""
+        if self.first_frame is None:
+            self.first_frame = frame_id
+        self.last_frame = frame_id
+        self.probes += 1
+        if score is not None:
+            decayed = self.decay * self.level if self.level is not None else score
+            self.level = max(score, decayed)
+        due = self.last_sampled is None or frame_id - self.last_sampled >= self.step()
+        if due:
+            self.last_sampled = frame_id
+            self.sampled += 1
+        return due
+
+    def summary(self):
+        span = self.last_frame - self.first_frame + 1 if self.first_frame is not None else 0
+        return {
+            "frames": span,
+            "probes": self.probes,
+            "sampled": self.sampled,
+            "mean_step": round(span / self.sampled, 2) if self.sampled else 0.0,
+        }
+
+    def report(self):
+        s = self.summary()
+        print(f"🎯 Adaptive sampling: {s['sampled']:,} of {s['frames']:,} frames sent to the model "
+              f"(every {s['mean_step']:.1f} frames on average, stride {self.min_step}–{self.max_step})")
+
+
+def adaptive_frames(cap, sampler, start_frame=0, max_frames=None, stop_frame=None):
+    """
+    Yield (frame_id, frame) at a stride chosen by `sampler` (a MotionSampler).
+
+    Every sampler.min_step-th frame is probed: it and the frame before it are
+    shrunk to grayscale thumbnails, and their difference is the motion
+    score, so scores mean the same thing whatever the stride. The sampler
+    decides which probes are passed on. `frame_id` is the absolute frame
+    index, as in sample_frames, so gaps between samples vary and downstream
+    code should use frame differences as dt. Stops after `max_frames`
+    samples or before `stop_frame`.
+    """
+    probe_step = sampler.min_step
+    position = max(start_frame - 1, 0)  # frame the next cap.read() returns
+    if position:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+
+    frame_id = start_frame
+    last = None  # (frame_id, thumbnail) of the last frame read
+    while cap.isOpened() and (max_frames is None or sampler.sampled < max_frames):
+        if stop_frame is not None and frame_id >= stop_frame:
+            break
+        if frame_id > 0 and (last is None or last[0] != frame_id - 1):
+            if not _catch_up(cap, position, frame_id - 1, None):
+                break
+            ret, before = cap.read()
+            if not ret:
+                break
+            last = (frame_id - 1, motion_thumbnail(before))
+            position = frame_id
+        if not _catch_up(cap, position, frame_id, None):
+            break
+        ret, frame = cap.read()
+        if not ret:
+            break
+        position = frame_id + 1
+        thumb = motion_thumbnail(frame)
+        score = motion_score(last[1], thumb) if last is not None else None
+        last = (frame_id, thumb)
+        if sampler.update(frame_id, score):
+            yield frame_id, frame
+        frame_id += probe_step
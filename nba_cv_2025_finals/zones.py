@@ -0,0 +1,122 @@
+# zones.py
+"""
+Out-of-core movement-zone clustering.
+
+Zones are fitted with seeded mini-batch k-means that reads court positions
+(x_norm, y_norm) one frame range at a time, so any number of games can be
+clustered without holding all detections in memory, and the same inputs always
+give the same zones. The fitted model is saved in the model registry
+(models/movement_zones/); labelling a new game is then a nearest-centroid
+lookup with no refit.
+
+Usage:
+    python zones.py game1_detections.csv [game2_detections.csv ...]
+"""
+
+import sys
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from detection_loader import iter_detections
+from model_registry import save_model, load_model, has_model
+
+ZONES_MODEL = "movement_zones"
+N_ZONES = 6
+SEED = 42
+CHUNK_FRAMES = 9000    # frames read per step (5 minutes of 30fps video); bounds peak memory
+BATCH_SIZE = 4096      # mini-batch size inside each chunk
+N_PASSES = 3           # passes over the data
+COLUMNS = ("x_norm", "y_norm")
+
+
+# --- Reading positions chunk by chunk ---
+def iter_position_chunks(paths, chunk_frames=CHUNK_FRAMES, columns=COLUMNS, **load_kwargs):
+    """
+    Yield (n, 2) float arrays of court positions, one frame range at a time.
+
+    Chunks are streamed from each source table and filtered on the fly
+    (load_kwargs: min_conf, labels, court_size), never loaded whole.
+    """
+    for path in paths:
+        for df in iter_detections(path, chunk_frames, columns=columns, **load_kwargs):
+            yield df.to_numpy(dtype=np.float64)
+
+
+# --- Fitting ---
+def fit_zones(paths, k=N_ZONES, seed=SEED, chunk_frames=CHUNK_FRAMES, batch_size=BATCH_SIZE,
+              n_passes=N_PASSES, **load_kwargs):
+    """
+    Fit k zone centroids over one or more detection tables without loading them whole.
+
+    Returns the fitted MiniBatchKMeans, with zones ordered by position.
+    """
+    model = MiniBatchKMeans(n_clusters=k, random_state=seed, batch_size=batch_size)
+    pending = None  # the first partial_fit needs at least k points to initialize
+    for _ in range(n_passes):
+        for chunk in iter_position_chunks(paths, chunk_frames, **load_kwargs):
+            for lo in range(0, len(chunk), batch_size):
+                batch = chunk[lo:lo + batch_size]
+                if pending is not None:
+                    batch, pending = np.vstack([pending, batch]), None
+                if not hasattr(model, "cluster_centers_") and len(batch) < k:
+                    pending = batch
+                    continue
+                model.partial_fit(batch)
+    if not hasattr(model, "cluster_centers_"):
+        raise ValueError(f"Need at least {k} detections to fit {k} zones")
+
+    # Order zones left-to-right, bottom-to-top so labels are stable between refits
+    centers = model.cluster_centers_
+    model.cluster_centers_ = centers[np.lexsort((centers[:, 1], centers[:, 0]))]
+    return model
+
+
+def zone_counts(paths, model, chunk_frames=CHUNK_FRAMES, **load_kwargs):
+    """Detections per zone, counted chunk by chunk."""
+    counts = np.zeros(model.n_clusters, dtype=np.int64)
+    for chunk in iter_position_chunks(paths, chunk_frames, **load_kwargs):
+        counts += np.bincount(model.predict(chunk), minlength=model.n_clusters)
+    return counts
+
+
+# --- Registered zones ---
+def save_zones(model, paths, counts=None, name=ZONES_MODEL):
+    """Register fitted zones; returns the ModelBundle."""
+    return save_model(
+        name, model, features=COLUMNS,
+        k=int(model.n_clusters),
+        seed=model.random_state,
+        sources=[str(p) for p in paths],
+        centroids=model.cluster_centers_.tolist(),
+        counts=counts.tolist() if counts is not None else None,
+    )
+
+
+def load_zones(name=ZONES_MODEL, version=None):
+    return load_model(name, version)
+
+
+def has_zones(name=ZONES_MODEL):
+    return has_model(name)
+
+
+def assign_zones(df, zones):
+    """Zone label for every row of df, from registered zones (no refit)."""
+    return zones.predict(df).astype(np.int32)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python zones.py <detections.csv> [more.csv ...]")
+        sys.exit(1)
+    paths = sys.argv[1:]
+    print(f"🧪 Fitting {N_ZONES} movement zones over {len(paths)} table(s), seed {SEED}...")
+    model = fit_zones(paths)
+    counts = zone_counts(paths, model)
+    zones = save_zones(model, paths, counts)
+    for i, ((x, y), n) in enumerate(zip(model.cluster_centers_, counts)):
+        print(f"   Zone {i+1}: ({x:5.1f}, {y:5.1f}) ft — {n:,} detections")
+    print(f"✅ Zones saved as {zones.name} v{zones.version}")
+
+
+if __name__ == "__main__":
+    main()